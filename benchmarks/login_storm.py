@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from currency_app.exceptions.exceptions import PasswordHasherBusyException
+from currency_app.utils.password_hasher import PasswordHasher
+
+
+async def probe(interval: float, lags: list[float], stop: asyncio.Event):
+    # a currency request stand-in: how late does a timer fire while logins are running
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def storm(mode: str, args: argparse.Namespace, hashed_password: str) -> dict:
+    password_hasher = PasswordHasher(args.workers, args.max_pending)
+    password_hasher.start()
+
+    async def login():
+        if mode == 'inline':
+            # what the services did before: bcrypt right on the event loop
+            return password_hasher.context.verify(args.password, hashed_password)
+        return await password_hasher.verify(args.password, hashed_password)
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.probe_interval, lags, stop))
+    await asyncio.sleep(args.probe_interval * 5)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(args.logins)), return_exceptions=True)
+    duration = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    password_hasher.stop()
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    rejected = sum(isinstance(result, PasswordHasherBusyException) for result in results)
+    return {
+        'mode': mode,
+        'logins': args.logins,
+        'rejected': rejected,
+        'duration_s': round(duration, 3),
+        'logins_per_s': round((args.logins - rejected) / duration, 1),
+        'loop_lag_p50_ms': round(statistics.median(lags_ms), 2),
+        'loop_lag_p99_ms': round(lags_ms[int(len(lags_ms) * 0.99) - 1], 2),
+        'loop_lag_max_ms': round(lags_ms[-1], 2)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Event loop latency while a burst of logins checks passwords')
+    parser.add_argument('--logins', type=int, default=32, help='Number of simultaneous logins')
+    parser.add_argument('--workers', type=int, default=2, help='Password hasher threads')
+    parser.add_argument('--max-pending', type=int, default=64, help='Password hasher queue cap')
+    parser.add_argument('--probe-interval', type=float, default=0.005, help='Timer period of the latency probe')
+    parser.add_argument('--password', default='correct horse battery staple')
+    args = parser.parse_args()
+    hashed_password = PasswordHasher(1, 1).context.hash(args.password)
+    for mode in ('inline', 'pool'):
+        report = await storm(mode, args, hashed_password)
+        print('  '.join(f'{key}={value}' for key, value in report.items()))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, Query
 from typing import Annotated
 
 from currency_app.api.schemas.currency import (
+    CurrencyConvertBatchRequest,
+    CurrencyConvertBatchResponse,
     CurrencyConvertRequest,
     CurrencyConvertResponse,
     ExchangeRateHistRequest,
@@ -230,3 +232,50 @@ async def convert_currency(
 ) -> CurrencyConvertResponse:
     convert_result = await currency_service.exchange_currency(currency_data)
     return convert_result
+
+
+@currency_router.post(
+    '/convert/batch',
+    summary='Batch currency conversion',
+    description='Convert arbitrary amounts of currencies on certain dates in one request. '
+                'Results keep input order, failed items contain an error instead of a result',
+    responses={
+        200: {
+            'model': CurrencyConvertBatchResponse,
+            'description': 'Conversion results',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'results': [
+                            {
+                                'from': 'USD',
+                                'to': 'RUB',
+                                'amount': '100',
+                                'date': '2025-01-01',
+                                'result': 11372.1575,
+                                'exchange_rate': 113.721575,
+                                'error': None
+                            },
+                            {
+                                'from': 'USD',
+                                'to': 'XXX',
+                                'amount': '100',
+                                'date': '2025-01-01',
+                                'result': None,
+                                'exchange_rate': None,
+                                'error': 'Wrong currency code(s) received. Please try again'
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+    },
+    dependencies=[Depends(validate_access_token)]
+)
+async def convert_currency_batch(
+        currency_service: Annotated[CurrencyService, Depends(get_currency_service)],
+        batch_data: CurrencyConvertBatchRequest
+) -> CurrencyConvertBatchResponse:
+    convert_results = await currency_service.exchange_currency_batch(batch_data)
+    return convert_results
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from redis.asyncio import ConnectionPool
 from typing import Annotated
 
 from currency_app.broker.admin import KafkaAdmin
-from currency_app.core.dependency import get_broker_admin
+from currency_app.cache.connect import get_pool_stats
+from currency_app.core.dependency import get_broker_admin, get_cache_warmup, get_redis_pool, get_scheduler
+from currency_app.scheduler.scheduler import Scheduler
+from currency_app.services.warmup import CacheWarmup
 
 
 health_router = APIRouter(
@@ -12,8 +16,14 @@ health_router = APIRouter(
 
 @health_router.get('/check')
 async def topic_presence_check(
-        admin_client: Annotated[KafkaAdmin, Depends(get_broker_admin)]
+        admin_client: Annotated[KafkaAdmin, Depends(get_broker_admin)],
+        cache_warmup: Annotated[CacheWarmup, Depends(get_cache_warmup)]
 ):
+    if not cache_warmup.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={'status': 'warming up'}
+        )
     all_topics = await admin_client.get_topics()
     if 'currency_info' in all_topics:
         return {'status': 'healthy'}
@@ -21,3 +31,24 @@ async def topic_presence_check(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         detail={'status': 'unhealthy'}
     )
+
+
+@health_router.get('/scheduler')
+async def scheduler_jobs_stats(
+        scheduler: Annotated[Scheduler, Depends(get_scheduler)]
+) -> dict[str, dict]:
+    return scheduler.get_stats()
+
+
+@health_router.get('/cache')
+async def cache_pool_stats(
+        redis_pool: Annotated[ConnectionPool, Depends(get_redis_pool)]
+) -> dict[str, int]:
+    return get_pool_stats(redis_pool)
+
+
+@health_router.get('/warmup')
+async def cache_warmup_report(
+        cache_warmup: Annotated[CacheWarmup, Depends(get_cache_warmup)]
+) -> dict:
+    return {'ready': cache_warmup.ready, **cache_warmup.report}
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from redis.asyncio import Redis
+from typing import Annotated
+
+from currency_app.core.dependency import get_cache_connection
+from currency_app.utils import metrics
+
+
+metrics_router = APIRouter(
+    tags=['metrics']
+)
+
+@metrics_router.get('/metrics', response_class=PlainTextResponse)
+async def prometheus_metrics(
+        redis_conn: Annotated[Redis, Depends(get_cache_connection)]
+):
+    # push this worker's pending samples first so the scrape is not a flush interval behind
+    await metrics.registry.flush(redis_conn)
+    return PlainTextResponse(
+        await metrics.registry.render(redis_conn),
+        media_type='text/plain; version=0.0.4'
+    )
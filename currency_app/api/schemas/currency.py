@@ -1,7 +1,7 @@
 from datetime import date
 from dateutil.parser import isoparse
 from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Any
+from typing import Any, ClassVar
 import re
 
 
@@ -67,6 +67,27 @@ class CurrencyConvertResponse(CurrencyConvertRequest):
     exchange_rate: float
 
 
+class CurrencyConvertBatchRequest(BaseModel):
+
+    items: list[CurrencyConvertRequest] = Field(
+        min_length=1,
+        max_length=10000,
+        description='Conversions to perform (at most 10000 per batch)'
+    )
+
+
+class CurrencyConvertBatchResult(CurrencyConvertRequest):
+
+    result: float | None = None
+    exchange_rate: float | None = None
+    error: str | None = None
+
+
+class CurrencyConvertBatchResponse(BaseModel):
+
+    results: list[CurrencyConvertBatchResult]
+
+
 class ExchangeRateRequest(BaseModel, SendEmailMixin):
 
     currencies: str = Field(
@@ -127,7 +148,13 @@ class ExchangeRatePeriodAlterRequest(ExchangeRateRequest):
 
 class ExchangeRatePeriodDailyRequest(ExchangeRatePeriodAlterRequest):
 
-    pass
+    max_days: ClassVar[int] = 365
+
+    @model_validator(mode='after')
+    def check_period_length(self):
+        if (isoparse(self.end_date) - isoparse(self.start_date)).days >= self.max_days:
+            raise ValueError(f'Period must not be longer than {self.max_days} days')
+        return self
 
 
 class ExchangeRatePeriodResponse(BaseModel):
@@ -0,0 +1,99 @@
+import asyncio
+import fcntl
+import math
+import numpy as np
+import os
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Mapping
+
+from currency_app.utils.rate_matrix import CurrencyIndex, PackedSnapshot, RateMatrix
+
+
+class RateArchive:
+
+    days_in_year = 366
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._years: dict[tuple[str, int], tuple[tuple[int, int], CurrencyIndex, np.ndarray]] = {}
+
+    def _file(self, source: str, year: int) -> Path:
+        return self.path / source / f'{year}.npy'
+
+    @staticmethod
+    def _row(day: date) -> int:
+        return day.timetuple().tm_yday - 1
+
+    def _open(self, source: str, year: int) -> tuple[CurrencyIndex, np.ndarray] | None:
+        data_file = self._file(source, year)
+        try:
+            stat = data_file.stat()
+        except FileNotFoundError:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if (opened := self._years.get((source, year))) is not None and opened[0] == version:
+            return opened[1:]
+        # the file is replaced atomically, a mapping of the old file stays valid until it is dropped here
+        records = np.load(data_file, mmap_mode='r')
+        # currency codes are the field names of the record dtype, so they can never disagree with the data
+        index = CurrencyIndex(records.dtype.names)
+        values = records.view(np.float64).reshape(self.days_in_year, len(index))
+        self._years[(source, year)] = (version, index, values)
+        return index, values
+
+    def get_snapshots(self, source: str, dates: list[str]) -> dict[str, PackedSnapshot]:
+        snapshots = {}
+        for date_ in dates:
+            day = date.fromisoformat(date_)
+            if (opened := self._open(source, day.year)) is None:
+                continue
+            index, values = opened
+            row = values[self._row(day)]
+            # same rule as for cached hashes, a stored day always contains the source itself
+            if source in index and not math.isnan(row[index.positions[source]]):
+                snapshots[date_] = PackedSnapshot(index, row)
+        return snapshots
+
+    async def store(self, source: str, snapshots: dict[str, Mapping[str, float]]):
+        # file writes wait on a cross-process flock, so they never run on the event loop
+        await asyncio.to_thread(self._store, source, snapshots)
+
+    def _store(self, source: str, snapshots: dict[str, Mapping[str, float]]):
+        years: dict[int, dict[str, Mapping[str, float]]] = {}
+        for date_, snapshot in snapshots.items():
+            years.setdefault(date.fromisoformat(date_).year, {})[date_] = snapshot
+        for year, year_snapshots in years.items():
+            with self._lock(source, year):
+                self._store_year(source, year, year_snapshots)
+
+    def _store_year(self, source: str, year: int, snapshots: dict[str, Mapping[str, float]]):
+        data_file = self._file(source, year)
+        opened = self._open(source, year)
+        old_index, old_values = opened if opened is not None else (CurrencyIndex(()), None)
+        matrix = RateMatrix.from_snapshots(snapshots)
+        index = CurrencyIndex((*old_index.codes, *matrix.index.codes))
+        values = np.full((self.days_in_year, len(index)), np.nan, dtype=np.float64)
+        if old_values is not None:
+            values[:, index.locate(old_index.codes)] = old_values
+        rows = [self._row(day.item()) for day in matrix.dates]
+        block = np.ix_(rows, index.locate(matrix.index.codes))
+        # a currency missing from an incoming snapshot keeps what is already archived for that day
+        values[block] = np.where(np.isnan(matrix.values), values[block], matrix.values)
+        records = values.view([(code, np.float64) for code in index.codes]).reshape(self.days_in_year)
+        tmp_data = data_file.with_suffix('.npy.tmp')
+        with open(tmp_data, 'wb') as file:
+            np.save(file, records)
+        os.replace(tmp_data, data_file)
+
+    @contextmanager
+    def _lock(self, source: str, year: int):
+        directory = self.path / source
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f'{year}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,59 @@
+import numpy as np
+import struct
+import zlib
+from typing import Mapping
+
+from currency_app.utils.rate_matrix import CurrencyIndex, PackedSnapshot
+
+
+class SnapshotCodecError(ValueError):
+    pass
+
+
+class SnapshotCodec:
+
+    version = 1
+    # version, number of rates, crc32 of the currency index the rates are ordered by
+    header = struct.Struct('<BHI')
+    dtype = np.dtype('<f8')
+
+    def __init__(self):
+        self.indexes: dict[int, CurrencyIndex] = {}
+
+    @staticmethod
+    def checksum(index: CurrencyIndex) -> int:
+        return zlib.crc32(','.join(index.codes).encode())
+
+    def register(self, index: CurrencyIndex) -> int:
+        checksum = self.checksum(index)
+        self.indexes.setdefault(checksum, index)
+        return checksum
+
+    def pack(self, snapshot: Mapping[str, float]) -> PackedSnapshot:
+        if isinstance(snapshot, PackedSnapshot):
+            return snapshot
+        index = CurrencyIndex(snapshot)
+        index = self.indexes.get(self.checksum(index), index)
+        return PackedSnapshot(index, np.fromiter((snapshot[code] for code in index.codes), dtype=self.dtype))
+
+    def encode(self, snapshot: Mapping[str, float]) -> bytes:
+        packed = self.pack(snapshot)
+        checksum = self.register(packed.index)
+        return self.header.pack(self.version, len(packed.index), checksum) + packed.values.astype(self.dtype).tobytes()
+
+    def read_header(self, payload: bytes) -> tuple[int, int]:
+        if len(payload) < self.header.size:
+            raise SnapshotCodecError('Truncated snapshot header')
+        version, size, checksum = self.header.unpack_from(payload)
+        if version != self.version:
+            raise SnapshotCodecError(f'Unsupported snapshot version {version}')
+        if len(payload) != self.header.size + size * self.dtype.itemsize:
+            raise SnapshotCodecError('Snapshot size does not match its header')
+        return size, checksum
+
+    def decode(self, payload: bytes) -> PackedSnapshot:
+        size, checksum = self.read_header(payload)
+        if (index := self.indexes.get(checksum)) is None or len(index) != size:
+            raise SnapshotCodecError(f'Unknown currency index {checksum:08x}')
+        # a read-only view over the payload, rates never become separate python objects
+        return PackedSnapshot(index, np.frombuffer(payload, dtype=self.dtype, offset=self.header.size))
@@ -1,14 +1,48 @@
+import logging
 import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
 
 from currency_app.core.config import settings
 
 
-def get_redis_connection():
-    redis_conn = aioredis.Redis(
+logger = logging.getLogger(__name__)
+
+
+def create_connection_pool() -> aioredis.BlockingConnectionPool:
+    connection_pool = aioredis.BlockingConnectionPool(
         host=settings.CACHE.HOST,
         port=settings.CACHE.PORT,
         db=settings.CACHE.DB,
         password=settings.CACHE.PASSWORD,
+        max_connections=settings.CACHE.MAX_CONNECTIONS,
+        timeout=settings.CACHE.POOL_TIMEOUT,
+        socket_timeout=settings.CACHE.SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.CACHE.SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.CACHE.HEALTH_CHECK_INTERVAL,
         decode_responses=True
     )
-    return redis_conn
+    return connection_pool
+
+
+def get_redis_connection(connection_pool: aioredis.ConnectionPool | None = None) -> aioredis.Redis:
+    if connection_pool is None:
+        return aioredis.Redis.from_pool(create_connection_pool())
+    return aioredis.Redis(connection_pool=connection_pool)
+
+
+def get_pool_stats(connection_pool: aioredis.ConnectionPool) -> dict[str, int]:
+    return {
+        'max_connections': connection_pool.max_connections,
+        'in_use_connections': len(connection_pool._in_use_connections),
+        'available_connections': len(connection_pool._available_connections)
+    }
+
+
+async def configure_eviction(redis_conn: aioredis.Redis):
+    if settings.CACHE.MAXMEMORY is None:
+        return
+    try:
+        await redis_conn.config_set('maxmemory', settings.CACHE.MAXMEMORY)
+        await redis_conn.config_set('maxmemory-policy', settings.CACHE.MAXMEMORY_POLICY)
+    except ResponseError:
+        logger.warning('Redis rejected CONFIG SET, maxmemory must be configured on the server')
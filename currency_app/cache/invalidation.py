@@ -0,0 +1,77 @@
+import asyncio
+import json
+import logging
+import uuid
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError, TimeoutError
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+
+    poll_interval = 1.0
+    retry_delay = 1.0
+
+    def __init__(self, redis_conn: Redis, channel: str):
+        self.redis_conn = redis_conn
+        self.channel = channel
+        self.worker_id = uuid.uuid4().hex
+        self._handlers: list[Callable[[dict], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def message(self, kind: str, **payload) -> str:
+        return json.dumps({'worker_id': self.worker_id, 'kind': kind, **payload})
+
+    def subscribe(self, handler: Callable[[dict], None]):
+        self._handlers.append(handler)
+
+    def start(self):
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis_conn.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # anything published while we were not subscribed is lost, so start from scratch
+                    self._dispatch({'worker_id': None, 'kind': 'reset'})
+                    while True:
+                        message = await pubsub.get_message(timeout=self.poll_interval)
+                        if message is not None:
+                            self._handle(message)
+            except (ConnectionError, TimeoutError):
+                logger.warning('Invalidation bus lost connection, resubscribing')
+                await asyncio.sleep(self.retry_delay)
+            except Exception:
+                # a dead listener would leave local copies stale without any signal
+                logger.exception('Invalidation bus listener failed, resubscribing')
+                await asyncio.sleep(self.retry_delay)
+
+    def _handle(self, message: dict):
+        try:
+            payload = json.loads(message['data'])
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict) or not {'worker_id', 'kind'} <= payload.keys():
+            logger.warning('Skipping malformed invalidation message %r', message['data'])
+            return
+        self._dispatch(payload)
+
+    def _dispatch(self, message: dict):
+        if message['worker_id'] == self.worker_id:
+            return
+        for handler in self._handlers:
+            try:
+                handler(message)
+            except Exception:
+                logger.exception('Invalidation handler failed for %s message', message['kind'])
@@ -0,0 +1,69 @@
+from redis.asyncio import Redis
+
+from currency_app.cache.invalidation import InvalidationBus
+from currency_app.core.config import settings
+from currency_app.repositories.currency_cache import CurrencyCache
+
+
+class LegacyRatesMigration:
+
+    legacy_key = 'rates'
+    legacy_snapshot_pattern = 'snapshot:*'
+    chunk_size = 500
+
+    def __init__(self, redis_conn: Redis):
+        self.redis_conn = redis_conn
+        self.base_source = settings.CURRENCY.BASE_SOURCE
+        self.rates_ttl = settings.CACHE.RATES_TTL
+
+    async def run(self, dry_run: bool = False, keep_legacy: bool = False) -> dict[str, int]:
+        async with self.redis_conn as red:
+            hashes, report = await self._collect(red)
+            if not dry_run:
+                await self._write(red, hashes)
+                # running workers may hold local copies of the rewritten snapshots
+                invalidation_bus = InvalidationBus(red, settings.CACHE.INVALIDATION_CHANNEL)
+                await red.publish(invalidation_bus.channel, invalidation_bus.message('reset'))
+                if not keep_legacy:
+                    await self._drop_legacy(red)
+        report['hashes'] = len(hashes)
+        return report
+
+    async def _collect(self, red: Redis) -> tuple[dict[str, dict[str, float]], dict[str, int]]:
+        hashes = {}
+        report = {'pairs': 0, 'pairs_skipped': 0, 'snapshots': 0}
+        # the legacy document is {from: {to: {date: rate}}}, only pairs against the base source are reusable
+        for from_, targets in (await red.json().get(self.legacy_key) or {}).items():
+            for to_, dates in targets.items():
+                for date_, rate in dates.items():
+                    if from_ == self.base_source:
+                        code, value = to_, rate
+                    elif to_ == self.base_source and rate:
+                        code, value = from_, round(1 / rate, 6)
+                    else:
+                        report['pairs_skipped'] += 1
+                        continue
+                    key = CurrencyCache.rates_key(self.base_source, date_)
+                    hashes.setdefault(key, {})[code] = value
+                    report['pairs'] += 1
+        async for key in red.scan_iter(match=self.legacy_snapshot_pattern, count=self.chunk_size):
+            _, source, date_ = key.split(':')
+            if snapshot := await red.json().get(key):
+                hashes.setdefault(CurrencyCache.rates_key(source, date_), {}).update(snapshot)
+                report['snapshots'] += 1
+        return hashes, report
+
+    async def _write(self, red: Redis, hashes: dict[str, dict[str, float]]):
+        keys = list(hashes)
+        for start in range(0, len(keys), self.chunk_size):
+            pipe = red.pipeline(transaction=True)
+            for key in keys[start:start + self.chunk_size]:
+                pipe.hset(key, mapping=hashes[key])
+                pipe.expire(key, self.rates_ttl)
+            await pipe.execute()
+
+    async def _drop_legacy(self, red: Redis):
+        await red.delete(self.legacy_key)
+        legacy_snapshots = [key async for key in red.scan_iter(match=self.legacy_snapshot_pattern)]
+        for start in range(0, len(legacy_snapshots), self.chunk_size):
+            await red.delete(*legacy_snapshots[start:start + self.chunk_size])
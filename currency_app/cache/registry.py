@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from currency_app.utils.rate_matrix import CurrencyIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+class CurrencyRegistry:
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.names: dict[str, str] = {}
+        self.codes: frozenset[str] = frozenset()
+        self.index = CurrencyIndex(())
+        self.loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def expired(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.ttl
+
+    def load(self, currencies: dict[str, str]):
+        self.names = dict(currencies)
+        self.codes = frozenset(currencies)
+        self.index = CurrencyIndex(currencies)
+        self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    def evict(self, message: dict):
+        if message['kind'] in ('currencies', 'reset'):
+            self.invalidate()
+
+    async def ensure(self, loader: Callable[[], Awaitable[dict[str, str]]]):
+        if not self.expired:
+            return
+        async with self._lock:
+            if not self.expired:
+                return
+            try:
+                self.load(await loader())
+            except Exception:
+                if not self.codes:
+                    raise
+                logger.warning('Currency registry reload failed, serving %d cached codes', len(self.codes))
+
+    def contains(self, codes: set[str]) -> bool:
+        return codes <= self.codes
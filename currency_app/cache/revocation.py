@@ -0,0 +1,115 @@
+import asyncio
+import heapq
+import logging
+import time
+from redis.asyncio import Redis
+from typing import Awaitable, Callable, Iterable
+
+from currency_app.cache.invalidation import InvalidationBus
+
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationStore:
+
+    key = 'revoked_tokens'
+    # the set itself carries no TTL, so a missing marker means Redis lost it and it is rebuilt from Postgres
+    loaded_marker = '__loaded__'
+    retry_delay = 5.0
+
+    def __init__(
+            self,
+            redis_conn: Redis,
+            invalidation_bus: InvalidationBus,
+            loader: Callable[[], Awaitable[dict[str, float]]]
+    ):
+        self.redis_conn = redis_conn
+        self.invalidation_bus = invalidation_bus
+        self.loader = loader
+        self.revoked: dict[str, float] = {}
+        self._expiry: list[tuple[float, str]] = []
+        self._listeners: list[Callable[[Iterable[str]], None]] = []
+        self.ready = False
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self.revoked)
+
+    def subscribe(self, listener: Callable[[Iterable[str]], None]):
+        self._listeners.append(listener)
+
+    def contains(self, jti: str) -> bool:
+        return jti in self.revoked
+
+    async def revoke(self, tokens: dict[str, float]):
+        if not tokens:
+            return
+        self._add(tokens)
+        async with self.redis_conn.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.key, tokens)
+            pipe.zremrangebyscore(self.key, '-inf', time.time())
+            pipe.publish(self.invalidation_bus.channel, self.invalidation_bus.message('revoked', tokens=tokens))
+            await pipe.execute()
+
+    def _add(self, tokens: dict[str, float]):
+        for jti, expires_at in tokens.items():
+            self.revoked[jti] = expires_at
+            heapq.heappush(self._expiry, (expires_at, jti))
+        self._prune()
+        for listener in self._listeners:
+            listener(tokens)
+
+    def _prune(self):
+        # the set holds every pair revoked within the refresh lifetime, so it is never rebuilt as a whole
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._expiry)
+            if self.revoked.get(jti) == expires_at:
+                del self.revoked[jti]
+
+    def evict(self, message: dict):
+        match message['kind']:
+            case 'revoked':
+                self._add(message['tokens'])
+            case 'reset':
+                # revocations published while the bus was away are only in Redis, Postgres answers until reloaded
+                self.ready = False
+                if self._task is None or self._task.done():
+                    self._task = asyncio.create_task(self._load())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _load(self):
+        while True:
+            try:
+                tokens = await self._read()
+                if tokens is None:
+                    tokens = await self.loader()
+                    await self._write(tokens)
+            except Exception:
+                logger.exception('Loading revoked tokens failed, retrying in %s s', self.retry_delay)
+                await asyncio.sleep(self.retry_delay)
+            else:
+                break
+        self._add(tokens)
+        self.ready = True
+        logger.info('Revocation store holds %d tokens', len(self.revoked))
+
+    async def _read(self) -> dict[str, float] | None:
+        tokens = dict(await self.redis_conn.zrangebyscore(self.key, time.time(), '+inf', withscores=True))
+        if tokens.pop(self.loaded_marker, None) is None:
+            return None
+        return tokens
+
+    async def _write(self, tokens: dict[str, float]):
+        async with self.redis_conn.pipeline(transaction=True) as pipe:
+            if tokens:
+                pipe.zadd(self.key, tokens)
+            pipe.zadd(self.key, {self.loaded_marker: float('inf')})
+            await pipe.execute()
@@ -0,0 +1,51 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from currency_app.utils import metrics
+
+
+class TokenCache:
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict[str, Any]] = OrderedDict()
+        self._keys: dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self.key(token)
+        if (claims := self._entries.get(key)) is None:
+            metrics.cache_requests.inc('token', 'miss')
+            return None
+        if claims['exp'] <= time.time():
+            self._drop(key)
+            metrics.cache_requests.inc('token', 'miss')
+            return None
+        self._entries.move_to_end(key)
+        metrics.cache_requests.inc('token', 'hit')
+        return claims
+
+    def set(self, token: str, claims: dict[str, Any]):
+        key = self.key(token)
+        self._entries[key] = claims
+        self._entries.move_to_end(key)
+        self._keys[claims['jti']] = key
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: bytes):
+        claims = self._entries.pop(key)
+        self._keys.pop(claims['jti'], None)
+
+    def evict(self, jtis: Iterable[str]):
+        for jti in jtis:
+            if (key := self._keys.pop(jti, None)) is not None:
+                self._entries.pop(key, None)
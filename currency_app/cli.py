@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.connect import get_redis_connection
+from currency_app.cache.invalidation import InvalidationBus
+from currency_app.cache.local import LocalCache
+from currency_app.cache.migration import LegacyRatesMigration
+from currency_app.client.currency import CurrencyClient
+from currency_app.core.config import settings
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.services.backfill import HistoryBackfill
+from currency_app.services.token_partitions import TokenPartitions
+from currency_app.utils.unitofwork import UserUnitOfWork
+
+
+async def migrate_rates(args: argparse.Namespace):
+    report = await LegacyRatesMigration(get_redis_connection()).run(
+        dry_run=args.dry_run,
+        keep_legacy=args.keep_legacy
+    )
+    print(json.dumps(report))
+
+
+async def backfill(args: argparse.Namespace):
+    end = min(args.end, date.today() - timedelta(days=1))
+    if args.skip_cache and settings.CACHE.ARCHIVE_PATH is None:
+        raise SystemExit('Nothing to write into: --skip-cache is set and CACHE__ARCHIVE_PATH is not configured')
+    currency_client = CurrencyClient()
+    await currency_client.start()
+    async with get_redis_connection() as redis_conn:
+        try:
+            currency_cache = None if args.skip_cache else CurrencyCache(
+                redis_conn,
+                LocalCache(ttl=settings.CACHE.LOCAL_TTL, max_entries=1),
+                InvalidationBus(redis_conn, settings.CACHE.INVALIDATION_CHANNEL)
+            )
+            history_backfill = HistoryBackfill(
+                currency_client,
+                currency_cache,
+                RateArchive(settings.CACHE.ARCHIVE_PATH) if settings.CACHE.ARCHIVE_PATH else None,
+                checkpoint_path=args.checkpoint,
+                concurrency=args.concurrency,
+                requests_per_minute=args.rpm
+            )
+            report = await history_backfill.run(args.sources.split(','), args.start, end, dry_run=args.dry_run)
+        finally:
+            await currency_client.close()
+    print(json.dumps(report))
+
+
+async def prune_tokens(args: argparse.Namespace):
+    report = await TokenPartitions(UserUnitOfWork()).run(dry_run=args.dry_run)
+    print(json.dumps(report))
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m currency_app.cli')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    migrate = commands.add_parser(
+        'migrate-rates',
+        help='Move the legacy RedisJSON rates document into per (source, date) hashes'
+    )
+    migrate.add_argument('--dry-run', action='store_true', help='Only report what would be migrated')
+    migrate.add_argument('--keep-legacy', action='store_true', help='Do not delete legacy keys after migration')
+    migrate.set_defaults(handler=migrate_rates)
+
+    history = commands.add_parser(
+        'backfill',
+        help='Load historical rates for a date range into the cache and the archive using timeframe requests'
+    )
+    history.add_argument('start', type=date.fromisoformat, help='First date of the range (iso format)')
+    history.add_argument('end', type=date.fromisoformat, help='Last date of the range (iso format)')
+    history.add_argument(
+        '--sources',
+        default=settings.CURRENCY.BASE_SOURCE,
+        help='Comma separated source currencies, the base source by default'
+    )
+    history.add_argument('--concurrency', type=int, default=4, help='Max number of requests in flight')
+    history.add_argument('--rpm', type=float, default=60, help='Max number of upstream requests per minute')
+    history.add_argument(
+        '--checkpoint',
+        type=Path,
+        default=Path('backfill-checkpoint.json'),
+        help='File with completed chunks, used to resume an interrupted backfill'
+    )
+    history.add_argument('--skip-cache', action='store_true', help='Write into the archive only')
+    history.add_argument('--dry-run', action='store_true', help='Only report how many upstream requests are needed')
+    history.set_defaults(handler=backfill)
+
+    prune = commands.add_parser(
+        'prune-tokens',
+        help='Create upcoming jwt_tokens partitions and drop the ones whose tokens have all expired'
+    )
+    prune.add_argument('--dry-run', action='store_true', help='Only report what would be created and dropped')
+    prune.set_defaults(handler=prune_tokens)
+
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == '__main__':
+    main()
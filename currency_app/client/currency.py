@@ -1,39 +1,104 @@
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
 from datetime import datetime, timezone
 from urllib.parse import urljoin
 
 from currency_app.api.schemas.currency import (
-    CurrencyConvertRequest,
-    CurrencyConvertResponse,
     ExchangeRateHistRequest,
-    ExchangeRatePeriodAlterRequest,
-    ExchangeRatePeriodAlterResponse,
-    ExchangeRatePeriodDailyRequest,
-    ExchangeRatePeriodDailyResponse,
     ExchangeRateRequest,
     ExchangeRateResponse
 )
+from currency_app.cache.local import LocalCache
 from currency_app.core.config import settings
-from currency_app.exceptions.exceptions import CurrencyConversionException, ExchangeRateInfoException
+from currency_app.exceptions.exceptions import CurrencyApiUnavailableException, ExchangeRateInfoException
+from currency_app.utils import metrics
+from currency_app.utils.micro_batcher import MicroBatcher
+from currency_app.utils.rate_matrix import RateMatrix
+from currency_app.utils.single_flight import SingleFlight
 
 
 class CurrencyClient:
 
+    # invalid key, inactive account, unknown function, usage limit and restricted plan say nothing about the data
+    unavailable_codes = frozenset({101, 102, 103, 104, 105})
+    # the api gateway answers bad keys, quota exhaustion and throttling itself, without a success field
+    unavailable_statuses = frozenset({401, 403, 429})
+
     def __init__(self):
-        self.async_session = ClientSession
         self.settings = settings.CURRENCY
         self.header = {'apikey': self.settings.API_KEY}
+        self.session = None
+        self.single_flight = SingleFlight()
+        self.negative_cache = LocalCache(self.settings.NEGATIVE_TTL, self.settings.NEGATIVE_MAX_ENTRIES)
+        self.unavailable_cache = LocalCache(self.settings.UNAVAILABLE_TTL, self.settings.NEGATIVE_MAX_ENTRIES)
+        self.live_batcher = MicroBatcher(
+            'live',
+            self._get_live_exchange_rate_batch,
+            window=self.settings.LIVE_BATCH_WINDOW,
+            max_size=self.settings.LIVE_BATCH_MAX_SIZE
+        )
+
+    async def start(self):
+        connector = TCPConnector(
+            limit=self.settings.POOL_LIMIT,
+            limit_per_host=self.settings.POOL_LIMIT_PER_HOST,
+            keepalive_timeout=self.settings.KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=self.settings.DNS_CACHE_TTL
+        )
+        timeout = ClientTimeout(
+            connect=self.settings.CONNECT_TIMEOUT,
+            sock_read=self.settings.READ_TIMEOUT
+        )
+        self.session = ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers=self.header
+        )
+
+    async def close(self):
+        await self.session.close()
+
+    @staticmethod
+    def _request_key(endpoint: str, params: dict) -> tuple:
+        normalized = {key: str(value) for key, value in params.items()}
+        if currencies := normalized.get('currencies'):
+            normalized['currencies'] = ','.join(sorted(set(currencies.split(','))))
+        return endpoint, tuple(sorted(normalized.items()))
 
     async def _currency_api_request(self, endpoint: str, params: dict = None) -> dict:
         params = {} if params is None else params
-        async with self.async_session() as session:
-            url = urljoin(self.settings.API_URL, endpoint)
-            response = await session.get(
-                url,
-                params=params,
-                headers={'apikey': self.settings.API_KEY}
-            )
-            data = await response.json()
+        key = self._request_key(endpoint, params)
+        if (data := self.negative_cache.get(key)) is not None:
+            metrics.cache_requests.inc('negative', 'hit')
+            return data
+        if self.unavailable_cache.get(key) is not None:
+            metrics.cache_requests.inc('unavailable', 'hit')
+            raise CurrencyApiUnavailableException
+        return await self.single_flight.do(key, lambda: self._send_request(key, endpoint, params))
+
+    async def _send_request(self, key: tuple, endpoint: str, params: dict) -> dict:
+        url = urljoin(self.settings.API_URL, endpoint)
+        with metrics.upstream_latency.time(endpoint):
+            try:
+                async with self.session.get(url, params=params) as response:
+                    status = response.status
+                    data = await response.json()
+            except (ClientError, TimeoutError) as exc:
+                metrics.upstream_requests.inc(endpoint, 'failed')
+                self.unavailable_cache.set(key, True)
+                raise CurrencyApiUnavailableException from exc
+        if status >= 500 or status in self.unavailable_statuses or 'success' not in data:
+            metrics.upstream_requests.inc(endpoint, 'failed')
+            self.unavailable_cache.set(key, True)
+            raise CurrencyApiUnavailableException
+        if data.get('success') is False:
+            if data.get('error', {}).get('code') in self.unavailable_codes:
+                metrics.upstream_requests.inc(endpoint, 'failed')
+                self.unavailable_cache.set(key, True)
+                raise CurrencyApiUnavailableException
+            metrics.upstream_requests.inc(endpoint, 'error')
+            self.negative_cache.set(key, data)
+        else:
+            metrics.upstream_requests.inc(endpoint, 'success')
         return data
 
     async def get_currency_list(self) -> dict[str, str]:
@@ -41,23 +106,6 @@ class CurrencyClient:
         currencies = data.get('currencies')
         return currencies
 
-    async def convert_currency(
-            self,
-            currency_data: CurrencyConvertRequest
-    ) -> CurrencyConvertResponse:
-        data = await self._currency_api_request('convert', params=currency_data.model_dump(by_alias=True))
-        if not data.get('success'):
-            raise CurrencyConversionException
-        convert_result = {
-            'exchange_from': data['query']['from'],
-            'exchange_to': data['query']['to'],
-            'amount': str(data['query']['amount']),
-            'date': data['date'],
-            'result': data['result'],
-            'exchange_rate': data['info']['quote']
-        }
-        return CurrencyConvertResponse.model_validate(convert_result)
-
     async def _get_exchange_rate_info(
             self,
             currency_data: ExchangeRateRequest | ExchangeRateHistRequest,
@@ -71,20 +119,36 @@ class CurrencyClient:
         )
         if not data.get('success'):
             raise ExchangeRateInfoException
-        new_data = {}
-        for key, value in data['quotes'].items():
-            currency = key.split(data['source'])[1]
-            new_data[currency] = value
-        data['exchange_rate'] = new_data
-        del data['quotes']
-        data['date'] = datetime.fromtimestamp(data.pop('timestamp'), timezone.utc).strftime('%Y-%m-%d %H:%M')
-        return ExchangeRateResponse.model_validate(data)
+        return self._build_exchange_rate_response(data, currency_data.currencies.split(','))
+
+    @staticmethod
+    def _build_exchange_rate_response(data: dict, currencies: list[str]) -> ExchangeRateResponse:
+        timestamp = datetime.fromtimestamp(data['timestamp'], timezone.utc)
+        rate_matrix = RateMatrix.from_quotes(data['source'], {timestamp.date().isoformat(): data['quotes']})
+        return rate_matrix.to_exchange_rate_response(
+            data['source'],
+            currencies,
+            timestamp.strftime('%Y-%m-%d %H:%M')
+        )
 
     async def get_live_exchange_rate_info(
             self,
             currency_data: ExchangeRateRequest
     ) -> ExchangeRateResponse:
-        return await self._get_exchange_rate_info(currency_data, live=True)
+        if not self.settings.LIVE_BATCH_WINDOW:
+            return await self._get_exchange_rate_info(currency_data, live=True)
+        return await self.live_batcher.submit(currency_data.source, currency_data.currencies.split(','))
+
+    async def _get_live_exchange_rate_batch(
+            self,
+            source: str,
+            requested: list[list[str]]
+    ) -> list[ExchangeRateResponse]:
+        currencies = sorted({currency for currency_list in requested for currency in currency_list})
+        data = await self._currency_api_request('live', {'source': source, 'currencies': ','.join(currencies)})
+        if not data.get('success'):
+            raise ExchangeRateInfoException
+        return [self._build_exchange_rate_response(data, currency_list) for currency_list in requested]
 
     async def get_hist_exchange_rate_info(
             self,
@@ -92,41 +156,35 @@ class CurrencyClient:
     ) -> ExchangeRateResponse:
         return await self._get_exchange_rate_info(currency_data, live=False)
 
-    async def get_daily_exchange_rate_info(
-            self,
-            currency_data: ExchangeRatePeriodDailyRequest
-    ) -> ExchangeRatePeriodDailyResponse:
-        data = await self._currency_api_request(
-            'timeframe',
-            params=currency_data.model_dump(exclude={'send_email'})
-        )
+    async def _get_quotes(self, endpoint: str, params: dict) -> dict:
+        data = await self._currency_api_request(endpoint, params=params)
         if not data.get('success'):
             raise ExchangeRateInfoException
-        new_data = {}
-        for date_, info in data['quotes'].items():
-            updated = {}
-            for currency, rate in info.items():
-                currency = currency.split(data['source'])[1]
-                updated[currency] = rate
-            new_data[date_] = updated
-        data['data'] = new_data
-        del data['quotes']
-        return ExchangeRatePeriodDailyResponse.model_validate(data)
-
-    async def get_exchange_rate_dynamics(
+        return data
+
+    @staticmethod
+    def _parse_quotes(source: str, quotes: dict[str, float]) -> dict[str, float]:
+        return {key[len(source):]: value for key, value in quotes.items()} | {source: 1.0}
+
+    async def get_live_rate_snapshot(self, source: str) -> tuple[int, dict[str, float]]:
+        data = await self._get_quotes('live', {'source': source})
+        return data['timestamp'], self._parse_quotes(data['source'], data['quotes'])
+
+    async def get_hist_rate_snapshot(self, date_: str, source: str) -> dict[str, float]:
+        data = await self._get_quotes('historical', {'date': date_, 'source': source})
+        return self._parse_quotes(data['source'], data['quotes'])
+
+    async def get_timeframe_rate_snapshots(
             self,
-            currency_data: ExchangeRatePeriodAlterRequest
-    ) -> ExchangeRatePeriodAlterResponse:
-        data = await self._currency_api_request(
-            'change',
-            params=currency_data.model_dump(exclude={'send_email'})
+            start_date: str,
+            end_date: str,
+            source: str
+    ) -> dict[str, dict[str, float]]:
+        data = await self._get_quotes(
+            'timeframe',
+            {'start_date': start_date, 'end_date': end_date, 'source': source}
         )
-        if not data.get('success'):
-            raise ExchangeRateInfoException
-        new_data = {}
-        for key, value in data['quotes'].items():
-            currency = key.split(data['source'])[1]
-            new_data[currency] = value
-        data['dynamics'] = new_data
-        del data['quotes']
-        return ExchangeRatePeriodAlterResponse.model_validate(data)
+        return {
+            date_: self._parse_quotes(data['source'], quotes)
+            for date_, quotes in data['quotes'].items()
+        }
@@ -1,6 +1,7 @@
 from dotenv import find_dotenv
 from functools import lru_cache
-from pydantic import BaseModel, Field, PositiveInt
+from pathlib import Path
+from pydantic import BaseModel, Field, NonNegativeFloat, NonNegativeInt, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict, PydanticBaseSettingsSource
 from sqlalchemy import URL
 from typing import Literal, Type, Tuple
@@ -29,12 +30,43 @@ class JWTSettings(BaseModel):
         default='HS256',
         description='One of digital signature algorithms for decoding/encoding JWT'
     )
+    DECODE_CACHE_MAX_ENTRIES: NonNegativeInt = Field(
+        default=10000,
+        description='Number of verified tokens whose claims are kept in a worker, 0 disables the cache'
+    )
+    PARTITION_PREMAKE_DAYS: PositiveInt = Field(
+        default=7,
+        description='Number of daily jwt_tokens partitions created ahead of the current day'
+    )
+    PARTITION_MAINTENANCE_INTERVAL: PositiveInt = Field(
+        default=3600,
+        description='Cadence in seconds of creating upcoming and dropping expired jwt_tokens partitions'
+    )
 
 
 class CurrencyApiSettings(BaseModel):
 
     API_KEY: str
     API_URL: str
+    BASE_SOURCE: str = Field(default='USD', pattern='^[A-Z]{3}$', description='Source currency of cached rate snapshots')
+    POOL_LIMIT: PositiveInt = Field(default=100, description='Total number of simultaneous connections to currency API')
+    POOL_LIMIT_PER_HOST: PositiveInt = Field(default=20, description='Number of simultaneous connections to one host')
+    KEEPALIVE_TIMEOUT: PositiveFloat = Field(default=30, description='Idle connection keep-alive time in seconds')
+    DNS_CACHE_TTL: PositiveInt = Field(default=300, description='Lifetime of resolved DNS entries in seconds')
+    CONNECT_TIMEOUT: PositiveFloat = Field(default=5, description='Timeout for acquiring and establishing a connection in seconds')
+    READ_TIMEOUT: PositiveFloat = Field(default=15, description='Timeout for reading a portion of response in seconds')
+    LIVE_BATCH_WINDOW: NonNegativeFloat = Field(
+        default=0.005,
+        description='Seconds to collect live rate requests per source into one call, 0 disables batching'
+    )
+    LIVE_BATCH_MAX_SIZE: PositiveInt = Field(default=64, description='Max number of live rate requests in one batch')
+    NEGATIVE_TTL: PositiveInt = Field(default=300, description='Lifetime of cached "no data" answers of currency API in seconds')
+    UNAVAILABLE_TTL: PositiveInt = Field(default=10, description='Seconds to fail fast after currency API was unavailable')
+    MAX_PARALLEL_FETCHES: PositiveInt = Field(
+        default=8,
+        description='Max number of upstream rate requests one API request keeps in flight'
+    )
+    NEGATIVE_MAX_ENTRIES: PositiveInt = Field(default=10000, description='Max number of negative cache entries per kind')
 
 
 class ExternalAuthSettings(BaseModel):
@@ -87,6 +119,73 @@ class CacheSettings(BaseModel):
     PORT: int
     DB: str
     PASSWORD: str | None = Field(default=None)
+    MAX_CONNECTIONS: PositiveInt = Field(default=50, description='Size of Redis connection pool of a worker')
+    POOL_TIMEOUT: PositiveFloat = Field(default=5, description='Seconds to wait for a free pooled connection')
+    SOCKET_TIMEOUT: PositiveFloat = Field(default=5, description='Redis command socket timeout in seconds')
+    SOCKET_CONNECT_TIMEOUT: PositiveFloat = Field(default=2, description='Redis connect timeout in seconds')
+    HEALTH_CHECK_INTERVAL: NonNegativeInt = Field(
+        default=30,
+        description='Seconds of idleness after which a pooled connection is checked before use'
+    )
+    LIVE_FRESH_TTL: NonNegativeInt = Field(
+        default=60,
+        description='Seconds a live snapshot is served without revalidation (0 disables live snapshot cache)'
+    )
+    LIVE_MAX_AGE: PositiveInt = Field(default=600, description='Max age of a stale live snapshot in seconds')
+    REGISTRY_TTL: PositiveInt = Field(default=3600, description='Lifetime of in-process currency registry in seconds')
+    RATES_TTL: PositiveInt = Field(default=2592000, description='Lifetime of a cached historical rate snapshot in seconds')
+    SNAPSHOT_ENCODING: Literal['hash', 'packed'] = Field(
+        default='hash',
+        description='Storage of historical snapshots: a Redis hash per date or a packed float64 array'
+    )
+    ARCHIVE_PATH: Path | None = Field(
+        default=None,
+        description='Directory of memory-mapped daily rate archive, disabled if not set'
+    )
+    LOCAL_TTL: PositiveInt = Field(default=3600, description='Lifetime of in-process snapshot copies in seconds')
+    LOCAL_MAX_ENTRIES: PositiveInt = Field(default=2048, description='Max number of in-process snapshot copies')
+    INVALIDATION_CHANNEL: str = Field(default='cache:invalidate', description='Pub/sub channel of cache invalidation bus')
+    MAXMEMORY: str | None = Field(default=None, description='Redis maxmemory to apply on startup, e.g. 256mb')
+    MAXMEMORY_POLICY: Literal['volatile-lru', 'volatile-lfu', 'volatile-ttl', 'allkeys-lru', 'allkeys-lfu'] = Field(
+        default='volatile-lru',
+        description='Redis eviction policy applied together with MAXMEMORY'
+    )
+
+
+class SchedulerSettings(BaseModel):
+
+    ENABLED: bool = Field(default=True, description='Run background rate prefetch jobs in app workers')
+    LIVE_REFRESH_INTERVAL: PositiveInt = Field(default=50, description='Live snapshot refresh cadence in seconds')
+    SEAL_DELAY: NonNegativeInt = Field(
+        default=300,
+        description='Seconds after UTC midnight to seal the previous day closing snapshot'
+    )
+    CURRENCIES_REFRESH_INTERVAL: PositiveInt = Field(
+        default=3600,
+        description='Available currencies refresh cadence in seconds (must be less than their 3 hour lifetime)'
+    )
+
+
+class WarmupSettings(BaseModel):
+
+    ENABLED: bool = Field(default=True, description='Preload caches before a worker reports ready')
+    DAYS: NonNegativeInt = Field(default=7, description='Number of past days of snapshots to preload')
+    CONCURRENCY: PositiveInt = Field(default=4, description='Max concurrent upstream requests during warm-up')
+    TIMEOUT: PositiveFloat = Field(default=30, description='Seconds after which the worker is ready regardless')
+
+
+class MetricsSettings(BaseModel):
+
+    FLUSH_INTERVAL: PositiveFloat = Field(default=5, description='Cadence of pushing worker metrics to Redis in seconds')
+
+
+class PasswordHashSettings(BaseModel):
+
+    WORKERS: PositiveInt = Field(default=2, description='Threads hashing and verifying passwords in a worker')
+    MAX_PENDING: PositiveInt = Field(
+        default=32,
+        description='Password operations queued or running in a worker before new ones are rejected with 503'
+    )
 
 
 class KafkaSettings(BaseModel):
@@ -104,6 +203,10 @@ class Settings(EnvFileSettings):
     YANDEX: YandexAuthSettings
     CURRENCY: CurrencyApiSettings
     KAFKA: KafkaSettings
+    SCHEDULER: SchedulerSettings = Field(default_factory=SchedulerSettings)
+    WARMUP: WarmupSettings = Field(default_factory=WarmupSettings)
+    METRICS: MetricsSettings = Field(default_factory=MetricsSettings)
+    PASSWORD_HASH: PasswordHashSettings = Field(default_factory=PasswordHashSettings)
 
     model_config = SettingsConfigDict(
         extra='forbid',
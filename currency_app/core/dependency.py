@@ -4,7 +4,12 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from currency_app.cache.connect import get_redis_connection
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.invalidation import InvalidationBus
+from currency_app.cache.local import LocalCache
+from currency_app.cache.registry import CurrencyRegistry
+from currency_app.cache.revocation import RevocationStore
+from currency_app.cache.tokens import TokenCache
 from currency_app.client.currency import CurrencyClient
 from currency_app.client.google import GoogleClient
 from currency_app.client.yandex import YandexClient
@@ -16,7 +21,9 @@ from currency_app.repositories.user import UserRepository
 from currency_app.services.auth import AuthService
 from currency_app.services.currency import CurrencyService
 from currency_app.services.user import UserService
+from currency_app.services.warmup import CacheWarmup
 from currency_app.utils.jwt_auth import JWTAuth
+from currency_app.utils.password_hasher import PasswordHasher
 from currency_app.utils.unitofwork import UserUnitOfWork
 
 
@@ -44,22 +51,43 @@ def get_yandex_client(
     return yandex_client
 
 
+def get_password_hasher(request: Request) -> PasswordHasher:
+    password_hasher = request.app.state.password_hasher
+    return password_hasher
+
+
 def get_user_service(
-        user_uow: Annotated[UserUnitOfWork, Depends(get_user_uow)]
+        user_uow: Annotated[UserUnitOfWork, Depends(get_user_uow)],
+        password_hasher: Annotated[PasswordHasher, Depends(get_password_hasher)]
 ) -> UserService:
-    return UserService(uow=user_uow)
+    return UserService(uow=user_uow, password_hasher=password_hasher)
+
+
+def get_revocation_store(request: Request) -> RevocationStore:
+    revocation_store = request.app.state.revocation_store
+    return revocation_store
+
+
+def get_token_cache(request: Request) -> TokenCache | None:
+    token_cache = request.app.state.token_cache
+    return token_cache
 
 
 def get_auth_service(
         auth_uow: Annotated[UserUnitOfWork, Depends(get_user_uow)],
         google_client: Annotated[GoogleClient, Depends(get_google_client)],
-        yandex_client: Annotated[YandexClient, Depends(get_yandex_client)]
+        yandex_client: Annotated[YandexClient, Depends(get_yandex_client)],
+        revocation_store: Annotated[RevocationStore, Depends(get_revocation_store)],
+        token_cache: Annotated[TokenCache | None, Depends(get_token_cache)],
+        password_hasher: Annotated[PasswordHasher, Depends(get_password_hasher)]
 ) -> AuthService:
     return AuthService(
         uow=auth_uow,
         google_client=google_client,
         yandex_client=yandex_client,
-        jwt_auth=JWTAuth()
+        jwt_auth=JWTAuth(token_cache),
+        revocation_store=revocation_store,
+        password_hasher=password_hasher
     )
 
 
@@ -108,22 +136,32 @@ async def validate_refresh_token(
     return await auth_service.validate_token(refresh_token, token_type='refresh', verify_exp=True)
 
 
-def get_currency_client(
-        currency_client: Annotated[CurrencyClient, Depends()]
-):
+def get_currency_client(request: Request) -> CurrencyClient:
+    currency_client = request.app.state.currency_client
     return currency_client
 
 
-def get_cache_connection(
-        cache_connection: Annotated[Redis, Depends(get_redis_connection)]
-):
+def get_cache_connection(request: Request) -> Redis:
+    cache_connection = request.app.state.redis_conn
     return cache_connection
 
 
+def get_local_cache(request: Request) -> LocalCache:
+    local_cache = request.app.state.local_cache
+    return local_cache
+
+
+def get_invalidation_bus(request: Request) -> InvalidationBus:
+    invalidation_bus = request.app.state.invalidation_bus
+    return invalidation_bus
+
+
 def get_currency_cache(
-        cache_connection: Annotated[Redis, Depends(get_cache_connection)]
+        cache_connection: Annotated[Redis, Depends(get_cache_connection)],
+        local_cache: Annotated[LocalCache, Depends(get_local_cache)],
+        invalidation_bus: Annotated[InvalidationBus, Depends(get_invalidation_bus)]
 ):
-    return CurrencyCache(cache_connection)
+    return CurrencyCache(cache_connection, local_cache, invalidation_bus)
 
 
 def get_broker_publisher(request: Request):
@@ -136,13 +174,42 @@ def get_broker_admin(request: Request):
     return admin_client
 
 
+def get_currency_registry(request: Request) -> CurrencyRegistry:
+    currency_registry = request.app.state.currency_registry
+    return currency_registry
+
+
+def get_redis_pool(request: Request):
+    redis_pool = request.app.state.redis_pool
+    return redis_pool
+
+
+def get_cache_warmup(request: Request) -> CacheWarmup:
+    cache_warmup = request.app.state.cache_warmup
+    return cache_warmup
+
+
+def get_rate_archive(request: Request) -> RateArchive | None:
+    rate_archive = request.app.state.rate_archive
+    return rate_archive
+
+
+def get_scheduler(request: Request):
+    scheduler = request.app.state.scheduler
+    return scheduler
+
+
 def get_currency_service(
         currency_client: Annotated[CurrencyClient, Depends(get_currency_client)],
         currency_cache: Annotated[CurrencyCache, Depends(get_currency_cache)],
-        currency_publisher: Annotated[AsyncAPIDefaultPublisher, Depends(get_broker_publisher)]
+        currency_registry: Annotated[CurrencyRegistry, Depends(get_currency_registry)],
+        currency_publisher: Annotated[AsyncAPIDefaultPublisher, Depends(get_broker_publisher)],
+        rate_archive: Annotated[RateArchive | None, Depends(get_rate_archive)]
 ):
     return CurrencyService(
         currency_client=currency_client,
         currency_cache=currency_cache,
-        currency_publisher=currency_publisher
+        currency_registry=currency_registry,
+        currency_publisher=currency_publisher,
+        rate_archive=rate_archive
     )
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, ForeignKey, Integer, Text
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
 
@@ -22,10 +23,16 @@ class User(Base):
 class JWTToken(Base):
 
     __tablename__ = 'jwt_tokens'
+    __table_args__ = (
+        Index('ix_jwt_tokens_email_revoked', 'email', 'revoked'),
+        {'postgresql_partition_by': 'RANGE (issued_at)'}
+    )
 
-    token_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    jti: Mapped[str] = mapped_column(Uuid(as_uuid=False), primary_key=True)
+    issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
     token_type: Mapped[str]
     email: Mapped[str] = mapped_column(Text, ForeignKey('users.email', ondelete='CASCADE'))
     revoked: Mapped[bool] = mapped_column(Boolean, default=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     user: Mapped['User'] = relationship(back_populates='tokens', passive_deletes=True, single_parent=True)
\ No newline at end of file
@@ -9,6 +9,17 @@ class UserAlreadyExistsException(HTTPException):
         self.message = message
 
 
+class PasswordHasherBusyException(HTTPException):
+
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Too many password checks in progress',
+            headers={'Retry-After': '1'}
+        )
+        self.message = message
+
+
 class AuthException(HTTPException):
 
     def __init__(self, message: str):
@@ -61,10 +72,11 @@ class InvalidGoogleTokenException(InvalidTokenException):
 
 class CurrencyException(HTTPException):
 
+    http_status = status.HTTP_406_NOT_ACCEPTABLE
 
     def __init__(self):
         super().__init__(
-            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            status_code=self.http_status,
             detail=getattr(self, 'detail', None)
         )
 
@@ -81,4 +93,10 @@ class ExchangeRateInfoException(CurrencyException):
 
 class WrongCurrencyCodeException(CurrencyException):
 
-    detail = 'Wrong currency code(s) received. Please try again'
\ No newline at end of file
+    detail = 'Wrong currency code(s) received. Please try again'
+
+
+class CurrencyApiUnavailableException(CurrencyException):
+
+    http_status = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = 'Currency API is temporarily unavailable. Please try again later'
\ No newline at end of file
@@ -25,5 +25,6 @@ async def base_exception_handler(request: Request, exc: AuthException):
     )
     return ORJSONResponse(
         status_code=exc.status_code,
-        content=error
+        content=error,
+        headers=getattr(exc, 'headers', None)
     )
\ No newline at end of file
@@ -7,9 +7,33 @@ from currency_app.broker.broker import Broker
 from currency_app.api.endpoints.auth import auth_router
 from currency_app.api.endpoints.currency import currency_router
 from currency_app.api.endpoints.health import health_router
+from currency_app.api.endpoints.metrics import metrics_router
 from currency_app.api.endpoints.user import user_router
-from currency_app.exceptions.exceptions import UserAlreadyExistsException
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.connect import configure_eviction, create_connection_pool, get_redis_connection
+from currency_app.cache.invalidation import InvalidationBus
+from currency_app.cache.local import LocalCache
+from currency_app.cache.registry import CurrencyRegistry
+from currency_app.cache.revocation import RevocationStore
+from currency_app.cache.tokens import TokenCache
+from currency_app.client.currency import CurrencyClient
+from currency_app.core.config import settings
+from currency_app.exceptions.exceptions import PasswordHasherBusyException, UserAlreadyExistsException
 from currency_app.exceptions.handlers import register_exception_handlers, base_exception_handler
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.scheduler.jobs import PrefetchJobs
+from currency_app.scheduler.scheduler import Scheduler
+from currency_app.services.token_partitions import TokenPartitions
+from currency_app.services.warmup import CacheWarmup
+from currency_app.utils import metrics
+from currency_app.utils.password_hasher import PasswordHasher
+from currency_app.utils.unitofwork import UserUnitOfWork
+
+
+async def load_revoked_tokens() -> dict[str, float]:
+    uow = UserUnitOfWork()
+    async with uow:
+        return await uow.jwt_repo.get_revoked_tokens()
 
 
 @asynccontextmanager
@@ -22,7 +46,58 @@ async def lifespan(app: FastAPI):
     await kafka_broker.connect()
     kafka_broker.create_publisher('currency_info')
     app.state.kafka_broker = kafka_broker
+    password_hasher = PasswordHasher(settings.PASSWORD_HASH.WORKERS, settings.PASSWORD_HASH.MAX_PENDING)
+    password_hasher.start()
+    app.state.password_hasher = password_hasher
+    currency_client = CurrencyClient()
+    await currency_client.start()
+    app.state.currency_client = currency_client
+    redis_pool = create_connection_pool()
+    redis_conn = get_redis_connection(redis_pool)
+    app.state.redis_pool = redis_pool
+    app.state.redis_conn = redis_conn
+    await configure_eviction(redis_conn)
+    metrics.registry.start(redis_conn, settings.METRICS.FLUSH_INTERVAL)
+    currency_registry = CurrencyRegistry(ttl=settings.CACHE.REGISTRY_TTL)
+    app.state.currency_registry = currency_registry
+    local_cache = LocalCache(ttl=settings.CACHE.LOCAL_TTL, max_entries=settings.CACHE.LOCAL_MAX_ENTRIES)
+    app.state.local_cache = local_cache
+    invalidation_bus = InvalidationBus(redis_conn, settings.CACHE.INVALIDATION_CHANNEL)
+    currency_cache = CurrencyCache(redis_conn, local_cache, invalidation_bus)
+    invalidation_bus.subscribe(currency_cache.evict_local)
+    invalidation_bus.subscribe(currency_registry.evict)
+    revocation_store = RevocationStore(redis_conn, invalidation_bus, load_revoked_tokens)
+    invalidation_bus.subscribe(revocation_store.evict)
+    app.state.revocation_store = revocation_store
+    token_cache = TokenCache(settings.JWT.DECODE_CACHE_MAX_ENTRIES) if settings.JWT.DECODE_CACHE_MAX_ENTRIES else None
+    if token_cache is not None:
+        revocation_store.subscribe(token_cache.evict)
+    app.state.token_cache = token_cache
+    invalidation_bus.start()
+    app.state.invalidation_bus = invalidation_bus
+    rate_archive = RateArchive(settings.CACHE.ARCHIVE_PATH) if settings.CACHE.ARCHIVE_PATH else None
+    app.state.rate_archive = rate_archive
+    scheduler = Scheduler(currency_cache)
+    if settings.SCHEDULER.ENABLED:
+        PrefetchJobs(currency_client, currency_cache, currency_registry, rate_archive).register(scheduler)
+    token_partitions = TokenPartitions(UserUnitOfWork())
+    await token_partitions.ensure(currency_cache)
+    token_partitions.register(scheduler)
+    scheduler.start()
+    app.state.scheduler = scheduler
+    cache_warmup = CacheWarmup(currency_client, currency_cache, currency_registry, rate_archive)
+    cache_warmup.start()
+    app.state.cache_warmup = cache_warmup
     yield
+    await cache_warmup.stop()
+    await scheduler.stop()
+    await invalidation_bus.stop()
+    await revocation_store.stop()
+    await currency_client.close()
+    password_hasher.stop()
+    await metrics.registry.stop(redis_conn)
+    await redis_conn.aclose()
+    await redis_pool.disconnect()
     await kafka_broker.disconnect()
     await admin.close()
 
@@ -37,7 +112,9 @@ app = FastAPI(
 )
 register_exception_handlers(app)
 app.add_exception_handler(UserAlreadyExistsException, base_exception_handler)
+app.add_exception_handler(PasswordHasherBusyException, base_exception_handler)
 app.include_router(user_router)
 app.include_router(auth_router)
 app.include_router(currency_router)
-app.include_router(health_router)
\ No newline at end of file
+app.include_router(health_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""'jwt_tokens keyed by jti'
+
+Revision ID: 7c3f1a9d2b64
+Revises: 0e5dc120ee8a
+Create Date: 2026-10-18 12:04:31.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f1a9d2b64'
+down_revision: Union[str, None] = '0e5dc120ee8a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jwt_tokens', sa.Column('jti', sa.Uuid(as_uuid=False), nullable=True), schema='currency_converter')
+    op.add_column(
+        'jwt_tokens',
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        schema='currency_converter'
+    )
+    # jti and exp are read from the base64url payload of the stored token
+    op.execute("""
+        UPDATE currency_converter.jwt_tokens AS tokens
+        SET jti = (decoded.payload ->> 'jti')::uuid,
+            expires_at = to_timestamp((decoded.payload ->> 'exp')::double precision)
+        FROM (
+            SELECT token_id,
+                   convert_from(
+                       decode(rpad(translate(part, '-_', '+/'), (length(part) + 3) / 4 * 4, '='), 'base64'),
+                       'UTF8'
+                   )::jsonb AS payload
+            FROM (
+                SELECT token_id, split_part(token_id, '.', 2) AS part
+                FROM currency_converter.jwt_tokens
+            ) AS parts
+        ) AS decoded
+        WHERE tokens.token_id = decoded.token_id
+    """)
+    op.drop_constraint('jwt_tokens_pkey', 'jwt_tokens', type_='primary', schema='currency_converter')
+    op.drop_column('jwt_tokens', 'token_id', schema='currency_converter')
+    op.alter_column('jwt_tokens', 'jti', nullable=False, schema='currency_converter')
+    op.alter_column('jwt_tokens', 'expires_at', nullable=False, schema='currency_converter')
+    op.create_primary_key('jwt_tokens_pkey', 'jwt_tokens', ['jti'], schema='currency_converter')
+    op.create_index(
+        'ix_jwt_tokens_email_revoked',
+        'jwt_tokens',
+        ['email', 'revoked'],
+        schema='currency_converter'
+    )
+
+
+def downgrade() -> None:
+    # encoded tokens cannot be restored from jti, users have to log in again
+    op.execute('DELETE FROM currency_converter.jwt_tokens')
+    op.drop_index('ix_jwt_tokens_email_revoked', 'jwt_tokens', schema='currency_converter')
+    op.drop_constraint('jwt_tokens_pkey', 'jwt_tokens', type_='primary', schema='currency_converter')
+    op.add_column('jwt_tokens', sa.Column('token_id', sa.Text(), nullable=False), schema='currency_converter')
+    op.create_primary_key('jwt_tokens_pkey', 'jwt_tokens', ['token_id'], schema='currency_converter')
+    op.drop_column('jwt_tokens', 'expires_at', schema='currency_converter')
+    op.drop_column('jwt_tokens', 'jti', schema='currency_converter')
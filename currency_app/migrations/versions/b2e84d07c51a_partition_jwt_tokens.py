@@ -0,0 +1,122 @@
+"""'partition jwt_tokens by issue day'
+
+Revision ID: b2e84d07c51a
+Revises: 7c3f1a9d2b64
+Create Date: 2026-10-18 15:42:09.307715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from currency_app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e84d07c51a'
+down_revision: Union[str, None] = '7c3f1a9d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rename_to_legacy() -> None:
+    op.rename_table('jwt_tokens', 'jwt_tokens_legacy', schema='currency_converter')
+    op.execute('ALTER TABLE currency_converter.jwt_tokens_legacy RENAME CONSTRAINT jwt_tokens_pkey TO jwt_tokens_legacy_pkey')
+    op.execute('ALTER INDEX currency_converter.ix_jwt_tokens_email_revoked RENAME TO ix_jwt_tokens_legacy_email_revoked')
+    op.execute(
+        'ALTER TABLE currency_converter.jwt_tokens_legacy '
+        'RENAME CONSTRAINT jwt_tokens_email_fkey TO jwt_tokens_legacy_email_fkey'
+    )
+
+
+def upgrade() -> None:
+    _rename_to_legacy()
+    op.create_table('jwt_tokens',
+    sa.Column('jti', sa.Uuid(as_uuid=False), nullable=False),
+    sa.Column('issued_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('token_type', sa.String(), nullable=False),
+    sa.Column('email', sa.Text(), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['email'], ['currency_converter.users.email'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti', 'issued_at'),
+    schema='currency_converter',
+    postgresql_partition_by='RANGE (issued_at)'
+    )
+    op.create_index(
+        'ix_jwt_tokens_email_revoked',
+        'jwt_tokens',
+        ['email', 'revoked'],
+        schema='currency_converter'
+    )
+    # iat was never stored, it is recovered from the expiry with the configured lifetimes
+    op.add_column(
+        'jwt_tokens_legacy',
+        sa.Column('issued_at', sa.DateTime(timezone=True), nullable=True),
+        schema='currency_converter'
+    )
+    op.execute(f"""
+        UPDATE currency_converter.jwt_tokens_legacy
+        SET issued_at = expires_at - make_interval(secs => CASE token_type
+            WHEN 'access' THEN {settings.JWT.ACCESS_TOKEN_EXPIRES}
+            ELSE {settings.JWT.REFRESH_TOKEN_EXPIRES}
+        END)
+    """)
+    # one partition per UTC day, from the oldest stored token up to the days the maintenance job creates ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            day date;
+        BEGIN
+            FOR day IN
+                SELECT generate_series(
+                    coalesce(min(issued_at AT TIME ZONE 'UTC')::date, current_date),
+                    current_date + {settings.JWT.PARTITION_PREMAKE_DAYS},
+                    interval '1 day'
+                )::date
+                FROM currency_converter.jwt_tokens_legacy
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE currency_converter.%I PARTITION OF currency_converter.jwt_tokens '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'jwt_tokens_p' || to_char(day, 'YYYYMMDD'),
+                    day::timestamp AT TIME ZONE 'UTC',
+                    (day + 1)::timestamp AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("""
+        INSERT INTO currency_converter.jwt_tokens (jti, issued_at, token_type, email, revoked, expires_at)
+        SELECT jti, issued_at, token_type, email, revoked, expires_at
+        FROM currency_converter.jwt_tokens_legacy
+    """)
+    op.drop_table('jwt_tokens_legacy', schema='currency_converter')
+
+
+def downgrade() -> None:
+    _rename_to_legacy()
+    op.create_table('jwt_tokens',
+    sa.Column('jti', sa.Uuid(as_uuid=False), nullable=False),
+    sa.Column('token_type', sa.String(), nullable=False),
+    sa.Column('email', sa.Text(), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['email'], ['currency_converter.users.email'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti'),
+    schema='currency_converter'
+    )
+    op.create_index(
+        'ix_jwt_tokens_email_revoked',
+        'jwt_tokens',
+        ['email', 'revoked'],
+        schema='currency_converter'
+    )
+    op.execute("""
+        INSERT INTO currency_converter.jwt_tokens (jti, token_type, email, revoked, expires_at)
+        SELECT jti, token_type, email, revoked, expires_at
+        FROM currency_converter.jwt_tokens_legacy
+    """)
+    # dropping the partitioned parent drops every partition with it
+    op.drop_table('jwt_tokens_legacy', schema='currency_converter')
@@ -1,54 +1,197 @@
-import json
+import logging
 from datetime import datetime, timedelta
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.client import NEVER_DECODE
+from typing import Iterable, Mapping
+
+from currency_app.cache.codec import SnapshotCodec, SnapshotCodecError
+from currency_app.cache.invalidation import InvalidationBus
+from currency_app.cache.local import LocalCache
+from currency_app.core.config import settings
+from currency_app.utils import metrics
+from currency_app.utils.rate_matrix import CurrencyIndex, PackedSnapshot
+
+
+logger = logging.getLogger(__name__)
 
 
 class CurrencyCache:
 
-    def __init__(self, redis_conn: Redis):
+    codec = SnapshotCodec()
+
+    def __init__(self, redis_conn: Redis, local_cache: LocalCache, invalidation_bus: InvalidationBus):
         self.redis_conn = redis_conn
+        self.local_cache = local_cache
+        self.invalidation_bus = invalidation_bus
+        self.settings = settings.CACHE
 
     async def get_available_currencies(self) -> dict[str, str]:
-        async with self.redis_conn as red:
-            currencies = await red.hgetall('available_currencies')
+        currencies = await self.redis_conn.hgetall('available_currencies')
+        metrics.cache_requests.inc('redis', 'hit' if currencies else 'miss')
         return currencies
 
     async def set_available_currencies(self, currencies):
-        async with self.redis_conn as red:
-            await red.hset(
-                'available_currencies',
-                mapping=currencies
-            )
-            delay = datetime.now() + timedelta(hours=3)
-            await red.expireat('available_currencies', delay)
-
-    async def get_exchange_rate(self, from_: str, to_: str, date_: str):
-        async with self.redis_conn as red:
-            rate = (await red.json().get('rates', f'$.{from_}.{to_}.{date_}'))
-        return rate[0] if rate else rate
-
-    async def set_exchange_rate(self, from_: str, to_: str, date_: str, rate: float):
-        async with self.redis_conn as red:
-            if not await red.json().type('rates', '$'):
-                await red.json().set(
-                    'rates',
-                    f'$',
-                    json.loads('{{"{}": {{"{}": {{"{}": {}}}}}}}'.format(from_, to_, date_, rate))
-                )
-            elif not await red.json().type('rates', f'$.{from_}'):
-                await red.json().set(
-                    'rates',
-                    f'$.{from_}',
-                    json.loads('{{"{}": {{"{}": {}}}}}'.format(to_, date_, rate))
-                )
-            elif not await red.json().type('rates', f'$.{from_}.{to_}'):
-                await red.json().set(
-                    'rates',
-                    f'$.{from_}.{to_}',
-                    json.loads('{{"{}": {}}}'.format(date_, rate))
-                )
-            elif not await red.json().type('rates', f'$.{from_}.{to_}.{date_}'):
-                await red.json().set(
-                    'rates',
-                    f'$.{from_}.{to_}.{date_}', rate
-                )
+        delay = datetime.now() + timedelta(hours=3)
+        pipe = self.redis_conn.pipeline(transaction=True)
+        pipe.hset('available_currencies', mapping=currencies)
+        pipe.expireat('available_currencies', delay)
+        pipe.publish(self.invalidation_bus.channel, self.invalidation_bus.message('currencies'))
+        await pipe.execute()
+
+    @staticmethod
+    def rates_key(source: str, date_: str) -> str:
+        return f'rates:{source}:{date_}'
+
+    @staticmethod
+    def packed_rates_key(source: str, date_: str) -> str:
+        return f'rates:{source}:{date_}:packed'
+
+    @staticmethod
+    def index_key(checksum: int) -> str:
+        return f'rates:index:{checksum:08x}'
+
+    @property
+    def packed(self) -> bool:
+        return self.settings.SNAPSHOT_ENCODING == 'packed'
+
+    async def get_rates(self, source: str, date_: str, codes: list[str]) -> dict[str, float]:
+        if self.packed:
+            snapshot = await self.get_rate_snapshot(source, date_) or {}
+            return {code: snapshot[code] for code in codes if code in snapshot}
+        if (snapshot := self.local_cache.get(('rates', source, date_))) is not None:
+            metrics.cache_requests.inc('local', 'hit')
+            return {code: snapshot[code] for code in codes if code in snapshot}
+        metrics.cache_requests.inc('local', 'miss')
+        rates = await self.redis_conn.hmget(self.rates_key(source, date_), codes)
+        metrics.cache_requests.inc('redis', 'miss' if None in rates else 'hit')
+        return {code: float(rate) for code, rate in zip(codes, rates) if rate is not None}
+
+    async def get_rate_snapshot(self, source: str, date_: str) -> Mapping[str, float] | None:
+        return (await self.get_rate_snapshots(source, [date_])).get(date_)
+
+    async def get_rate_snapshots(self, source: str, dates: list[str]) -> dict[str, Mapping[str, float]]:
+        snapshots = {}
+        for date_ in dates:
+            if (snapshot := self.local_cache.get(('rates', source, date_))) is not None:
+                snapshots[date_] = snapshot
+        missing = [date_ for date_ in dates if date_ not in snapshots]
+        metrics.cache_requests.inc('local', 'hit', amount=len(snapshots))
+        metrics.cache_requests.inc('local', 'miss', amount=len(missing))
+        if not missing:
+            return snapshots
+        if self.packed:
+            stored = await self._get_packed_snapshots(source, missing)
+        else:
+            stored = await self._get_hash_snapshots(source, missing)
+        metrics.cache_requests.inc('redis', 'hit', amount=len(stored))
+        metrics.cache_requests.inc('redis', 'miss', amount=len(missing) - len(stored))
+        for date_, snapshot in stored.items():
+            self.local_cache.set(('rates', source, date_), snapshot)
+        return snapshots | stored
+
+    async def _get_hash_snapshots(self, source: str, dates: list[str]) -> dict[str, dict[str, float]]:
+        pipe = self.redis_conn.pipeline(transaction=False)
+        for date_ in dates:
+            pipe.hgetall(self.rates_key(source, date_))
+        # only full snapshots contain the source itself, partial (migrated) hashes serve pair lookups only
+        return {
+            date_: {code: float(rate) for code, rate in snapshot.items()}
+            for date_, snapshot in zip(dates, await pipe.execute())
+            if source in snapshot
+        }
+
+    async def _get_packed_snapshots(self, source: str, dates: list[str]) -> dict[str, Mapping[str, float]]:
+        pipe = self.redis_conn.pipeline(transaction=False)
+        for date_ in dates:
+            # the connection decodes responses, packed payloads have to bypass it
+            pipe.execute_command('GET', self.packed_rates_key(source, date_), **{NEVER_DECODE: []})
+        payloads = {date_: payload for date_, payload in zip(dates, await pipe.execute()) if payload is not None}
+        await self._load_indexes(payloads.values())
+        snapshots = {}
+        for date_, payload in payloads.items():
+            try:
+                snapshots[date_] = self.codec.decode(payload)
+            except SnapshotCodecError as exc:
+                logger.warning('Packed snapshot %s is unreadable: %s', self.packed_rates_key(source, date_), exc)
+        return snapshots
+
+    async def _load_indexes(self, payloads: Iterable[bytes]):
+        unknown = set()
+        for payload in payloads:
+            try:
+                _, checksum = self.codec.read_header(payload)
+            except SnapshotCodecError:
+                continue
+            if checksum not in self.codec.indexes:
+                unknown.add(checksum)
+        if not unknown:
+            return
+        unknown = list(unknown)
+        for codes in await self.redis_conn.mget([self.index_key(checksum) for checksum in unknown]):
+            if codes is not None:
+                self.codec.register(CurrencyIndex(codes.split(',')))
+
+    async def set_rate_snapshot(self, source: str, date_: str, snapshot: dict[str, float]):
+        await self.set_rate_snapshots(source, {date_: snapshot})
+
+    async def set_rate_snapshots(self, source: str, snapshots: dict[str, Mapping[str, float]]):
+        if not snapshots:
+            return
+        pipe = self.redis_conn.pipeline(transaction=True)
+        if self.packed:
+            snapshots = {date_: self.codec.pack(snapshot) for date_, snapshot in snapshots.items()}
+            self._set_packed_snapshots(pipe, source, snapshots)
+        else:
+            self._set_hash_snapshots(pipe, source, snapshots)
+        pipe.publish(
+            self.invalidation_bus.channel,
+            self.invalidation_bus.message('rates', source=source, dates=list(snapshots))
+        )
+        await pipe.execute()
+        for date_, snapshot in snapshots.items():
+            self.local_cache.set(('rates', source, date_), snapshot)
+
+    def _set_hash_snapshots(self, pipe: Pipeline, source: str, snapshots: dict[str, Mapping[str, float]]):
+        for date_, snapshot in snapshots.items():
+            pipe.hset(self.rates_key(source, date_), mapping=snapshot)
+            pipe.expire(self.rates_key(source, date_), self.settings.RATES_TTL)
+
+    def _set_packed_snapshots(self, pipe: Pipeline, source: str, snapshots: dict[str, PackedSnapshot]):
+        for date_, snapshot in snapshots.items():
+            pipe.set(self.packed_rates_key(source, date_), self.codec.encode(snapshot), ex=self.settings.RATES_TTL)
+        # indexes are tiny and shared by all snapshots, so they are kept without a TTL
+        for index in {snapshot.index.codes: snapshot.index for snapshot in snapshots.values()}.values():
+            pipe.set(self.index_key(self.codec.checksum(index)), ','.join(index.codes))
+
+    async def get_live_snapshot(self, source: str) -> dict | None:
+        if (live_snapshot := self.local_cache.get(('live', source))) is not None:
+            metrics.cache_requests.inc('local', 'hit')
+            return live_snapshot
+        metrics.cache_requests.inc('local', 'miss')
+        if (live_snapshot := await self.redis_conn.json().get(f'live:{source}')) is not None:
+            self.local_cache.set(('live', source), live_snapshot)
+        metrics.cache_requests.inc('redis', 'miss' if live_snapshot is None else 'hit')
+        return live_snapshot
+
+    async def set_live_snapshot(self, source: str, live_snapshot: dict, max_age: int):
+        pipe = self.redis_conn.pipeline(transaction=True)
+        pipe.json().set(f'live:{source}', '$', live_snapshot)
+        pipe.expire(f'live:{source}', max_age)
+        pipe.publish(self.invalidation_bus.channel, self.invalidation_bus.message('live', source=source))
+        await pipe.execute()
+        self.local_cache.set(('live', source), live_snapshot)
+
+    def evict_local(self, message: dict):
+        match message['kind']:
+            case 'rates':
+                for date_ in message['dates']:
+                    self.local_cache.evict(('rates', message['source'], date_))
+            case 'live':
+                self.local_cache.evict(('live', message['source']))
+            case 'reset':
+                self.local_cache.clear()
+
+    async def acquire_lock(self, name: str, ttl: float) -> bool:
+        acquired = await self.redis_conn.set(f'lock:{name}', 1, nx=True, px=int(ttl * 1000))
+        return bool(acquired)
@@ -1,5 +1,6 @@
 import jwt
-from sqlalchemy import select
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from currency_app.db.models import JWTToken
@@ -7,42 +8,95 @@ from currency_app.db.models import JWTToken
 
 class JWTRepository:
 
+    partition_prefix = f'{JWTToken.__tablename__}_p'
+
     def __init__(self, async_session: AsyncSession):
         self.async_session = async_session
 
     async def add_user_tokens(self, tokens: tuple[str, str]):
-        payloads = {
-            token: jwt.decode(token, options={'verify_signature': False})
+        payloads = [
+            jwt.decode(token, options={'verify_signature': False})
             for token in tokens
-        }
+        ]
         tokens = [
             JWTToken(
-                token_id=token_id,
+                jti=payload['jti'],
                 token_type=payload['type'],
                 email=payload['sub'],
+                issued_at=datetime.fromtimestamp(payload['iat'], tz=timezone.utc),
+                expires_at=datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
             )
-            for token_id, payload in payloads.items()
+            for payload in payloads
         ]
         self.async_session.add_all(tokens)
 
-    async def check_token_revoked(self, token_id: str) -> bool:
+    async def check_token_revoked(self, jti: str, issued_at: datetime) -> bool | None:
         stmt = (
-            select(JWTToken.email, JWTToken.revoked)
-            .where(JWTToken.token_id == token_id)
+            select(JWTToken.revoked)
+            .where(JWTToken.jti == jti)
+            .where(JWTToken.issued_at == issued_at)
         )
-        email, status = (await self.async_session.execute(stmt)).one()
-
-        if status:
-            await self.revoke_user_tokens(email)
+        return await self.async_session.scalar(stmt)
 
-        return status
-
-    async def revoke_user_tokens(self, email: str):
+    async def revoke_user_tokens(self, email: str) -> dict[str, float]:
         stmt = (
-            select(JWTToken)
+            update(JWTToken)
             .where(JWTToken.email == email)
             .where(JWTToken.revoked == False)
+            .values(revoked=True)
+            .returning(JWTToken.jti, JWTToken.expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await self.async_session.execute(stmt)).all()
+        return {jti: expires_at.timestamp() for jti, expires_at in rows}
+
+    async def get_revoked_tokens(self) -> dict[str, float]:
+        stmt = (
+            select(JWTToken.jti, JWTToken.expires_at)
+            .where(JWTToken.revoked == True)
+            .where(JWTToken.expires_at > datetime.now(tz=timezone.utc))
         )
-        tokens = (await self.async_session.scalars(stmt)).all()
-        for token in tokens:
-            token.revoked = True
+        rows = (await self.async_session.execute(stmt)).all()
+        return {jti: expires_at.timestamp() for jti, expires_at in rows}
+
+    @classmethod
+    def partition_name(cls, day: date) -> str:
+        return f'{cls.partition_prefix}{day:%Y%m%d}'
+
+    async def get_partitions(self) -> dict[str, date]:
+        stmt = text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace
+            WHERE pg_namespace.nspname = :schema AND parent.relname = :table
+        """)
+        names = await self.async_session.scalars(
+            stmt,
+            {'schema': JWTToken.__table__.schema, 'table': JWTToken.__tablename__}
+        )
+        return {
+            name: datetime.strptime(name.removeprefix(self.partition_prefix), '%Y%m%d').date()
+            for name in names
+            if name.startswith(self.partition_prefix)
+        }
+
+    async def create_partition(self, day: date):
+        # bounds are UTC midnights, the same days tokens are grouped by
+        schema = JWTToken.__table__.schema
+        await self.async_session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {schema}.{self.partition_name(day)} '
+            f'PARTITION OF {schema}.{JWTToken.__tablename__} '
+            f"FOR VALUES FROM ('{day} 00:00:00+00') TO ('{day + timedelta(days=1)} 00:00:00+00')"
+        ))
+
+    async def count_partition_rows(self, names: list[str]) -> int:
+        if not names:
+            return 0
+        schema = JWTToken.__table__.schema
+        stmt = text(' UNION ALL '.join(f'SELECT count(*) FROM {schema}.{name}' for name in names))
+        return sum((await self.async_session.scalars(stmt)).all())
+
+    async def drop_partition(self, name: str):
+        await self.async_session.execute(text(f'DROP TABLE {JWTToken.__table__.schema}.{name}'))
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.registry import CurrencyRegistry
+from currency_app.client.currency import CurrencyClient
+from currency_app.core.config import settings
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.scheduler.scheduler import Scheduler
+from currency_app.services.rates import RateEngine
+
+
+class PrefetchJobs:
+
+    def __init__(
+            self,
+            currency_client: CurrencyClient,
+            currency_cache: CurrencyCache,
+            currency_registry: CurrencyRegistry,
+            rate_archive: RateArchive | None = None
+    ):
+        self.currency_client = currency_client
+        self.currency_cache = currency_cache
+        self.currency_registry = currency_registry
+        self.rate_engine = RateEngine(currency_client, currency_cache, rate_archive)
+        self.settings = settings.SCHEDULER
+
+    def register(self, scheduler: Scheduler):
+        if settings.CACHE.LIVE_FRESH_TTL:
+            scheduler.add_job(
+                'live_snapshot',
+                self.refresh_live_snapshot,
+                interval=self.settings.LIVE_REFRESH_INTERVAL
+            )
+        scheduler.add_job(
+            'closing_snapshot',
+            self.seal_closing_snapshot,
+            interval=timedelta(days=1).total_seconds(),
+            offset=self.settings.SEAL_DELAY
+        )
+        scheduler.add_job(
+            'available_currencies',
+            self.refresh_available_currencies,
+            interval=self.settings.CURRENCIES_REFRESH_INTERVAL
+        )
+
+    async def refresh_live_snapshot(self):
+        await self.rate_engine.refresh_live_snapshot()
+
+    async def seal_closing_snapshot(self):
+        yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+        await self.rate_engine.seal_snapshot(yesterday.isoformat())
+
+    async def refresh_available_currencies(self):
+        currencies = await self.currency_client.get_currency_list()
+        await self.currency_cache.set_available_currencies(currencies)
+        # the bus skips our own messages, so refresh the local registry directly
+        self.currency_registry.load(currencies)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from currency_app.repositories.currency_cache import CurrencyCache
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobStats:
+
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started_at: float | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+
+
+@dataclass
+class Job:
+
+    name: str
+    func: Callable[[], Awaitable[None]]
+    interval: float
+    offset: float = 0
+    stats: JobStats = field(default_factory=JobStats)
+
+    def next_tick(self, now: float) -> int:
+        return int((now - self.offset) // self.interval) + 1
+
+    def tick_time(self, tick: int) -> float:
+        return tick * self.interval + self.offset
+
+
+class Scheduler:
+
+    def __init__(self, currency_cache: CurrencyCache):
+        self.currency_cache = currency_cache
+        self.jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[None]], interval: float, offset: float = 0):
+        self.jobs[name] = Job(name=name, func=func, interval=interval, offset=offset)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._run_job(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_job(self, job: Job):
+        while True:
+            tick = job.next_tick(time.time())
+            await asyncio.sleep(max(job.tick_time(tick) - time.time(), 0))
+            # ticks are aligned to the epoch, so all workers compete for the same lease
+            try:
+                leased = await self.currency_cache.acquire_lock(f'scheduler:{job.name}:{tick}', job.interval)
+            except Exception:
+                logger.exception('Lease for job %s is unavailable', job.name)
+                leased = False
+            if not leased:
+                job.stats.skipped += 1
+                continue
+            await self._execute(job)
+
+    @staticmethod
+    async def _execute(job: Job):
+        stats = job.stats
+        stats.last_started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await job.func()
+        except Exception as exc:
+            stats.failures += 1
+            stats.last_error = repr(exc)
+            logger.exception('Job %s failed', job.name)
+        else:
+            stats.last_error = None
+        finally:
+            stats.runs += 1
+            stats.last_duration = time.perf_counter() - started
+            logger.info('Job %s finished in %.3f s', job.name, stats.last_duration)
+
+    def get_stats(self) -> dict[str, dict]:
+        return {
+            name: {'interval': job.interval, 'offset': job.offset, **vars(job.stats)}
+            for name, job in self.jobs.items()
+        }
@@ -1,7 +1,9 @@
-from passlib.context import CryptContext
+import time
+from datetime import datetime, timezone
 from typing import Literal
 
 from currency_app.api.schemas.auth import AuthTokens, UserCreds
+from currency_app.cache.revocation import RevocationStore
 from currency_app.client.google import GoogleClient
 from currency_app.client.yandex import YandexClient
 from currency_app.exceptions.exceptions import (
@@ -10,7 +12,9 @@ from currency_app.exceptions.exceptions import (
     UserNotFoundException,
     UserPasswordIncorrectException
 )
+from currency_app.utils import metrics
 from currency_app.utils.jwt_auth import JWTAuth
+from currency_app.utils.password_hasher import PasswordHasher
 from currency_app.utils.unitofwork import UserUnitOfWork
 
 
@@ -21,13 +25,16 @@ class AuthService:
             uow: UserUnitOfWork,
             google_client: GoogleClient,
             yandex_client: YandexClient,
-            jwt_auth: JWTAuth
+            jwt_auth: JWTAuth,
+            revocation_store: RevocationStore,
+            password_hasher: PasswordHasher
     ):
         self.uow = uow
         self.jwt_auth = jwt_auth
+        self.revocation_store = revocation_store
         self.google_client = google_client
         self.yandex_client = yandex_client
-        self._bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+        self.password_hasher = password_hasher
 
     async def login(self, user_creds: UserCreds) -> AuthTokens:
         await self._user_authenticate(user_creds)
@@ -41,7 +48,7 @@ class AuthService:
         )
 
     async def _verify_password(self, password: str, hashed_password: str) -> bool:
-        return self._bcrypt_context.verify(password, hashed_password)
+        return await self.password_hasher.verify(password, hashed_password)
 
     async def _user_authenticate(self, user_creds: UserCreds):
         async with self.uow:
@@ -69,14 +76,23 @@ class AuthService:
 
     async def revoke_tokens(self, email: str):
         async with self.uow:
-            await self.uow.jwt_repo.revoke_user_tokens(email)
+            revoked = await self.uow.jwt_repo.revoke_user_tokens(email)
             await self.uow.commit()
-
-    async def _check_token_revoked(self, token_id: str) -> bool:
-        print(token_id)
+        await self.revocation_store.revoke(revoked)
+
+    async def _check_token_revoked(self, decoded_token: dict) -> bool:
+        # expired tokens have already left the store, only a refresh still accepts them
+        if self.revocation_store.ready and decoded_token['exp'] > time.time():
+            metrics.revocation_checks.inc('memory')
+            return self.revocation_store.contains(decoded_token['jti'])
+        metrics.revocation_checks.inc('database')
         async with self.uow:
-            status = await self.uow.jwt_repo.check_token_revoked(token_id)
-        return status
+            status = await self.uow.jwt_repo.check_token_revoked(
+                decoded_token['jti'],
+                datetime.fromtimestamp(decoded_token['iat'], tz=timezone.utc)
+            )
+        # a missing row means its partition was pruned, so the token is long expired
+        return status is None or status
 
     async def validate_token(
             self,
@@ -89,7 +105,7 @@ class AuthService:
         if decoded_token['type'] != token_type:
             raise WrongTokenTypeException(message=f'Expected {token_type} token to be received')
 
-        if await self._check_token_revoked(token):
+        if await self._check_token_revoked(decoded_token):
             raise RevokedTokenException(message='Authentication failed due to revoked token')
 
         if not (email := decoded_token['sub']):
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from currency_app.cache.archive import RateArchive
+from currency_app.client.currency import CurrencyClient
+from currency_app.exceptions.exceptions import CurrencyException
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.services.rates import RateEngine
+from currency_app.utils.rate_limiter import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryBackfill:
+
+    def __init__(
+            self,
+            currency_client: CurrencyClient,
+            currency_cache: CurrencyCache | None,
+            rate_archive: RateArchive | None,
+            checkpoint_path: Path,
+            concurrency: int,
+            requests_per_minute: float
+    ):
+        self.currency_client = currency_client
+        self.currency_cache = currency_cache
+        self.rate_archive = rate_archive
+        self.checkpoint_path = checkpoint_path
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.checkpoint: dict[str, list[list[str]]] = {}
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path.exists():
+            self.checkpoint = json.loads(self.checkpoint_path.read_text())
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path.with_name(f'{self.checkpoint_path.name}.tmp')
+        tmp_path.write_text(json.dumps(self.checkpoint))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _done_days(self, source: str) -> set[date]:
+        done = set()
+        for start_date, end_date in self.checkpoint.get(source, []):
+            start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+            done.update(start + timedelta(days=offset) for offset in range((end - start).days + 1))
+        return done
+
+    def plan(self, sources: list[str], start: date, end: date) -> dict[str, list[tuple[date, date]]]:
+        self._load_checkpoint()
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        plan = {}
+        for source in sources:
+            done = self._done_days(source)
+            plan[source] = RateEngine.coalesce_gaps([day for day in days if day not in done])
+            # a longer span is rejected upstream as a whole, better to stop before spending the quota
+            for chunk_start, chunk_end in plan[source]:
+                if (chunk_end - chunk_start).days >= RateEngine.timeframe_limit:
+                    raise ValueError(f'Backfill chunk {chunk_start}..{chunk_end} exceeds {RateEngine.timeframe_limit} days')
+        return plan
+
+    async def run(self, sources: list[str], start: date, end: date, dry_run: bool = False) -> dict:
+        started = time.perf_counter()
+        plan = self.plan(sources, start, end)
+        chunks = [(source, chunk) for source, source_chunks in plan.items() for chunk in source_chunks]
+        report = {
+            'days': ((end - start).days + 1) * len(sources),
+            'days_pending': sum((chunk_end - chunk_start).days + 1 for _, (chunk_start, chunk_end) in chunks),
+            'requests': len(chunks),
+            'days_fetched': 0,
+            'chunks_failed': 0
+        }
+        if not dry_run:
+            results = await asyncio.gather(
+                *(self._backfill_chunk(source, chunk_start, chunk_end) for source, (chunk_start, chunk_end) in chunks),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(result, CurrencyException):
+                    raise result
+            report['chunks_failed'] = sum(isinstance(result, Exception) for result in results)
+            report['days_fetched'] = sum(result for result in results if not isinstance(result, Exception))
+        report['duration'] = round(time.perf_counter() - started, 3)
+        return report
+
+    async def _backfill_chunk(self, source: str, start: date, end: date) -> int:
+        async with self.semaphore:
+            await self.rate_limiter.acquire()
+            try:
+                snapshots = await self.currency_client.get_timeframe_rate_snapshots(
+                    start.isoformat(),
+                    end.isoformat(),
+                    source
+                )
+            except CurrencyException:
+                logger.warning('Backfill of %s %s..%s failed', source, start, end)
+                raise
+        if self.currency_cache is not None:
+            await self.currency_cache.set_rate_snapshots(source, snapshots)
+        if self.rate_archive is not None:
+            await self.rate_archive.store(source, snapshots)
+        self.checkpoint.setdefault(source, []).append([start.isoformat(), end.isoformat()])
+        self._save_checkpoint()
+        logger.info('Backfilled %s %s..%s, %d day(s)', source, start, end, len(snapshots))
+        return len(snapshots)
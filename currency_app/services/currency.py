@@ -1,10 +1,15 @@
-from datetime import date
+import math
+import numpy as np
+from datetime import datetime, timezone
 from typing import Literal
 
 from faststream.kafka.publisher.asyncapi import AsyncAPIDefaultPublisher
 from pydantic import EmailStr, BaseModel
 
 from currency_app.api.schemas.currency import (
+    CurrencyConvertBatchRequest,
+    CurrencyConvertBatchResponse,
+    CurrencyConvertBatchResult,
     CurrencyConvertRequest,
     CurrencyConvertResponse,
     ExchangeRateHistRequest,
@@ -16,9 +21,14 @@ from currency_app.api.schemas.currency import (
     ExchangeRateResponse
 )
 from currency_app.api.schemas.mail import CurrencyInfoMail
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.registry import CurrencyRegistry
 from currency_app.client.currency import CurrencyClient
-from currency_app.exceptions.exceptions import WrongCurrencyCodeException
+from currency_app.exceptions.exceptions import ExchangeRateInfoException, WrongCurrencyCodeException
 from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.services.rates import RateEngine
+from currency_app.utils import metrics
+from currency_app.utils.rate_matrix import RateMatrix
 
 
 class CurrencyService:
@@ -27,26 +37,32 @@ class CurrencyService:
             self,
             currency_client: CurrencyClient,
             currency_cache: CurrencyCache,
-            currency_publisher: AsyncAPIDefaultPublisher
+            currency_registry: CurrencyRegistry,
+            currency_publisher: AsyncAPIDefaultPublisher,
+            rate_archive: RateArchive | None = None
     ):
         self.currency_client = currency_client
         self.currency_cache = currency_cache
+        self.currency_registry = currency_registry
         self.currency_publisher = currency_publisher
+        self.rate_engine = RateEngine(currency_client, currency_cache, rate_archive)
 
     async def _check_incoming_currencies(self, currencies: set[str]):
-        if not (all_currencies := await self.currency_cache.get_available_currencies()):
-            all_currencies = await self.currency_client.get_currency_list()
-            await self.currency_cache.set_available_currencies(all_currencies)
-        if not currencies.issubset(set(all_currencies)):
+        await self.currency_registry.ensure(self._load_available_currencies)
+        if not self.currency_registry.contains(currencies):
             raise WrongCurrencyCodeException
 
-    async def get_available_currencies(self) -> dict[str, str]:
+    async def _load_available_currencies(self) -> dict[str, str]:
         if currencies := await self.currency_cache.get_available_currencies():
             return currencies
         currencies = await self.currency_client.get_currency_list()
         await self.currency_cache.set_available_currencies(currencies)
         return currencies
 
+    async def get_available_currencies(self) -> dict[str, str]:
+        await self.currency_registry.ensure(self._load_available_currencies)
+        return self.currency_registry.names
+
     async def exchange_currency(
             self,
             currency_data: CurrencyConvertRequest
@@ -54,33 +70,61 @@ class CurrencyService:
         exchange_from = currency_data.exchange_from
         exchange_to = currency_data.exchange_to
         await self._check_incoming_currencies({exchange_from, exchange_to})
+        rate = await self.rate_engine.get_rate(exchange_from, exchange_to, currency_data.date)
+        convert_result = CurrencyConvertResponse(
+            exchange_from=exchange_from,
+            exchange_to=exchange_to,
+            amount=currency_data.amount,
+            date=currency_data.date,
+            result=round(float(currency_data.amount) * rate, 4),
+            exchange_rate=rate
+        )
+        return convert_result
+
+    async def exchange_currency_batch(
+            self,
+            batch_data: CurrencyConvertBatchRequest
+    ) -> CurrencyConvertBatchResponse:
+        items = batch_data.items
+        await self.currency_registry.ensure(self._load_available_currencies)
+        rate_matrix = await self.rate_engine.get_matrix(sorted({item.date for item in items}))
+        rows = {date_: row for row, date_ in enumerate(rate_matrix.date_labels)}
 
-        if date.today().isoformat() != currency_data.date:
-            if rate := await self.currency_cache.get_exchange_rate(
-                from_=exchange_from,
-                to_=exchange_to,
-                date_=currency_data.date
+        errors = {}
+        for position, item in enumerate(items):
+            if not self.currency_registry.contains({item.exchange_from, item.exchange_to}):
+                errors[position] = WrongCurrencyCodeException.detail
+            elif not (
+                    item.date in rows and
+                    item.exchange_from in rate_matrix.index and
+                    item.exchange_to in rate_matrix.index
             ):
-                date_ = currency_data.date
-                result = round(float(currency_data.amount) * rate, 4)
-                convert_result = CurrencyConvertResponse(
-                    exchange_from=exchange_from,
-                    exchange_to=exchange_to,
-                    amount=currency_data.amount,
-                    date=date_,
+                errors[position] = ExchangeRateInfoException.detail
+        valid = [position for position in range(len(items)) if position not in errors]
+
+        rates = rate_matrix.pair_rates(
+            np.fromiter((rows[items[position].date] for position in valid), dtype=np.intp),
+            [items[position].exchange_from for position in valid],
+            [items[position].exchange_to for position in valid]
+        ).round(6)
+        amounts = np.fromiter((float(items[position].amount) for position in valid), dtype=np.float64)
+        converted = dict(zip(valid, zip(rates.tolist(), (amounts * rates).round(4).tolist())))
+
+        results = []
+        for position, item in enumerate(items):
+            rate, result = converted.get(position, (None, None))
+            if rate is not None and math.isnan(rate):
+                rate, result = None, None
+                errors[position] = ExchangeRateInfoException.detail
+            results.append(
+                CurrencyConvertBatchResult(
+                    **item.model_dump(),
                     result=result,
-                    exchange_rate=rate
+                    exchange_rate=rate,
+                    error=errors.get(position)
                 )
-                return convert_result
-        convert_result = await self.currency_client.convert_currency(currency_data)
-        if date.today().isoformat() != currency_data.date:
-            await self.currency_cache.set_exchange_rate(
-                from_=exchange_from,
-                to_=exchange_to,
-                date_=currency_data.date,
-                rate=convert_result.exchange_rate
-                    )
-        return convert_result
+            )
+        return CurrencyConvertBatchResponse(results=results)
 
     async def get_live_currency_exchange_rate(
             self,
@@ -92,7 +136,19 @@ class CurrencyService:
             currency_data.source
         }
         await self._check_incoming_currencies(input_currencies)
-        currency_info = await self.currency_client.get_live_exchange_rate_info(currency_data)
+        if self.rate_engine.cache_settings.LIVE_FRESH_TTL:
+            live_snapshot = await self.rate_engine.get_live_snapshot()
+            timestamp = datetime.fromtimestamp(live_snapshot['timestamp'], timezone.utc)
+            rate_matrix = RateMatrix.from_snapshots({timestamp.date().isoformat(): live_snapshot['rates']})
+            if currency_data.source not in rate_matrix.index:
+                raise ExchangeRateInfoException
+            currency_info = rate_matrix.to_exchange_rate_response(
+                currency_data.source,
+                currency_data.currencies.split(','),
+                timestamp.strftime('%Y-%m-%d %H:%M')
+            )
+        else:
+            currency_info = await self.currency_client.get_live_exchange_rate_info(currency_data)
         if currency_data.send_email:
             await self._publish_currency_info(currency_info, 'live', email)
         return currency_info
@@ -107,7 +163,14 @@ class CurrencyService:
             currency_data.source
         }
         await self._check_incoming_currencies(input_currencies)
-        currency_info = await self.currency_client.get_hist_exchange_rate_info(currency_data)
+        rate_matrix = await self.rate_engine.get_matrix([currency_data.date])
+        if not len(rate_matrix) or currency_data.source not in rate_matrix.index:
+            raise ExchangeRateInfoException
+        currency_info = rate_matrix.to_exchange_rate_response(
+            currency_data.source,
+            currency_data.currencies.split(','),
+            currency_data.date
+        )
         if currency_data.send_email:
             await self._publish_currency_info(currency_info, 'hist', email)
         return currency_info
@@ -122,7 +185,16 @@ class CurrencyService:
             currency_data.source
         }
         await self._check_incoming_currencies(input_currencies)
-        currency_info = await self.currency_client.get_exchange_rate_dynamics(currency_data)
+        period = [currency_data.start_date, currency_data.end_date]
+        rate_matrix = await self.rate_engine.get_matrix(sorted(set(period)))
+        if set(period) != set(rate_matrix.date_labels) or currency_data.source not in rate_matrix.index:
+            raise ExchangeRateInfoException
+        currency_info = rate_matrix.to_dynamics_response(
+            currency_data.source,
+            currency_data.currencies.split(','),
+            currency_data.start_date,
+            currency_data.end_date
+        )
         if currency_data.send_email:
             await self._publish_currency_info(currency_info, 'change', email)
         return currency_info
@@ -137,7 +209,15 @@ class CurrencyService:
             currency_data.source
         }
         await self._check_incoming_currencies(input_currencies)
-        currency_info = await self.currency_client.get_daily_exchange_rate_info(currency_data)
+        rate_matrix = await self.rate_engine.get_period_matrix(currency_data.start_date, currency_data.end_date)
+        if not len(rate_matrix) or currency_data.source not in rate_matrix.index:
+            raise ExchangeRateInfoException
+        currency_info = rate_matrix.to_daily_response(
+            currency_data.source,
+            currency_data.currencies.split(','),
+            currency_data.start_date,
+            currency_data.end_date
+        )
         if currency_data.send_email:
             await self._publish_currency_info(currency_info, 'daily', email)
         return currency_info
@@ -153,4 +233,10 @@ class CurrencyService:
             message=info.model_dump_json(),
             info_type=info_type
         )
-        await self.currency_publisher.publish(currency_info, 'currency_info')
+        with metrics.broker_publish_latency.time('currency_info'):
+            try:
+                await self.currency_publisher.publish(currency_info, 'currency_info')
+            except Exception:
+                metrics.broker_publishes.inc('currency_info', 'failed')
+                raise
+        metrics.broker_publishes.inc('currency_info', 'success')
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+from typing import Mapping
+
+from currency_app.cache.archive import RateArchive
+from currency_app.client.currency import CurrencyClient
+from currency_app.core.config import settings
+from currency_app.exceptions.exceptions import (
+    CurrencyApiUnavailableException,
+    CurrencyConversionException,
+    CurrencyException
+)
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.utils.rate_matrix import RateMatrix
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateEngine:
+
+    timeframe_limit = 365
+    _background_tasks: set[asyncio.Task] = set()
+
+    def __init__(
+            self,
+            currency_client: CurrencyClient,
+            currency_cache: CurrencyCache,
+            rate_archive: RateArchive | None = None
+    ):
+        self.currency_client = currency_client
+        self.currency_cache = currency_cache
+        self.rate_archive = rate_archive
+        self.base_source = settings.CURRENCY.BASE_SOURCE
+        self.cache_settings = settings.CACHE
+        self._fetch_limit = asyncio.Semaphore(settings.CURRENCY.MAX_PARALLEL_FETCHES)
+
+    async def get_snapshot(self, date_: str) -> Mapping[str, float]:
+        if snapshot := await self.currency_cache.get_rate_snapshot(self.base_source, date_):
+            return snapshot
+        if snapshot := self.get_archived_snapshots([date_]).get(date_):
+            return snapshot
+        snapshot = await self.currency_client.get_hist_rate_snapshot(date_, self.base_source)
+        await self.currency_cache.set_rate_snapshot(self.base_source, date_, snapshot)
+        return snapshot
+
+    async def seal_snapshot(self, date_: str) -> dict[str, float]:
+        snapshot = await self.currency_client.get_hist_rate_snapshot(date_, self.base_source)
+        await self.currency_cache.set_rate_snapshot(self.base_source, date_, snapshot)
+        await self.archive_snapshots({date_: snapshot})
+        return snapshot
+
+    def get_archived_snapshots(self, dates: list[str]) -> dict[str, Mapping[str, float]]:
+        if self.rate_archive is None or not dates:
+            return {}
+        return self.rate_archive.get_snapshots(self.base_source, dates)
+
+    async def archive_snapshots(self, snapshots: dict[str, Mapping[str, float]]):
+        if self.rate_archive is None or not snapshots:
+            return
+        await self.rate_archive.store(self.base_source, snapshots)
+
+    async def get_live_snapshot(self) -> dict:
+        if not self.cache_settings.LIVE_FRESH_TTL:
+            return await self._fetch_live_snapshot()
+        if not (live_snapshot := await self.currency_cache.get_live_snapshot(self.base_source)):
+            return await self.refresh_live_snapshot()
+        age = time.time() - live_snapshot['fetched_at']
+        if age >= self.cache_settings.LIVE_MAX_AGE:
+            return await self.refresh_live_snapshot()
+        if age >= self.cache_settings.LIVE_FRESH_TTL:
+            self._run_in_background(self._revalidate_live_snapshot())
+        return live_snapshot
+
+    async def _fetch_live_snapshot(self) -> dict:
+        timestamp, rates = await self.currency_client.get_live_rate_snapshot(self.base_source)
+        return {'timestamp': timestamp, 'fetched_at': time.time(), 'rates': rates}
+
+    async def refresh_live_snapshot(self) -> dict:
+        live_snapshot = await self._fetch_live_snapshot()
+        await self.currency_cache.set_live_snapshot(
+            self.base_source,
+            live_snapshot,
+            self.cache_settings.LIVE_MAX_AGE
+        )
+        return live_snapshot
+
+    async def _revalidate_live_snapshot(self):
+        client_settings = self.currency_client.settings
+        lock_ttl = client_settings.CONNECT_TIMEOUT + client_settings.READ_TIMEOUT
+        if not await self.currency_cache.acquire_lock(f'live:{self.base_source}', lock_ttl):
+            return
+        try:
+            await self.refresh_live_snapshot()
+        except CurrencyException:
+            logger.warning('Live snapshot revalidation for %s failed', self.base_source)
+
+    @classmethod
+    def _run_in_background(cls, coro):
+        task = asyncio.create_task(coro)
+        cls._background_tasks.add(task)
+        task.add_done_callback(cls._background_tasks.discard)
+
+    async def _limited(self, coro):
+        async with self._fetch_limit:
+            return await coro
+
+    async def get_snapshots(self, dates: list[str]) -> dict[str, Mapping[str, float]]:
+        today = date.today().isoformat()
+        snapshots = await self.currency_cache.get_rate_snapshots(
+            self.base_source,
+            [date_ for date_ in dates if date_ != today]
+        )
+        if today in dates:
+            snapshots[today] = await self._get_live_rates()
+        snapshots |= self.get_archived_snapshots([date_ for date_ in dates if date_ not in snapshots])
+        # a future date has no rates yet and would fail the whole timeframe span it falls into
+        missing = [date.fromisoformat(date_) for date_ in dates if date_ < today and date_ not in snapshots]
+        fetched = await self._fetch_gaps(missing)
+        return snapshots | {date_: fetched[date_] for date_ in dates if date_ in fetched}
+
+    async def _get_live_rates(self) -> dict[str, float]:
+        return (await self.get_live_snapshot())['rates']
+
+    async def get_matrix(self, dates: list[str]) -> RateMatrix:
+        return RateMatrix.from_snapshots(await self.get_snapshots(dates))
+
+    @classmethod
+    def coalesce_gaps(cls, missing: list[date]) -> list[tuple[date, date]]:
+        spans = []
+        for day in sorted(missing):
+            # a span of timeframe_limit days ends timeframe_limit - 1 days after its start
+            if spans and (day - spans[-1][0]).days < cls.timeframe_limit:
+                spans[-1] = (spans[-1][0], day)
+            else:
+                spans.append((day, day))
+        return spans
+
+    async def _fetch_gaps(self, missing: list[date]) -> dict[str, Mapping[str, float]]:
+        fetched = await asyncio.gather(
+            *(
+                self._limited(
+                    self.currency_client.get_timeframe_rate_snapshots(
+                        gap_start.isoformat(),
+                        gap_end.isoformat(),
+                        self.base_source
+                    )
+                )
+                for gap_start, gap_end in self.coalesce_gaps(missing)
+            ),
+            return_exceptions=True
+        )
+        for gap_snapshots in fetched:
+            # only "no data" answers are dropped, an outage has to reach the client as one
+            if isinstance(gap_snapshots, CurrencyApiUnavailableException) or (
+                    isinstance(gap_snapshots, Exception) and not isinstance(gap_snapshots, CurrencyException)
+            ):
+                raise gap_snapshots
+        snapshots = {
+            date_: snapshot
+            for gap_snapshots in fetched
+            if not isinstance(gap_snapshots, Exception)
+            for date_, snapshot in gap_snapshots.items()
+        }
+        await self.currency_cache.set_rate_snapshots(self.base_source, snapshots)
+        return snapshots
+
+    async def get_period_snapshots(self, start_date: str, end_date: str) -> dict[str, Mapping[str, float]]:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        today = date.today()
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        snapshots = await self.currency_cache.get_rate_snapshots(
+            self.base_source,
+            [day.isoformat() for day in dates if day < today]
+        )
+        if today in dates:
+            snapshots[today.isoformat()] = await self._get_live_rates()
+        snapshots |= self.get_archived_snapshots(
+            [day.isoformat() for day in dates if day < today and day.isoformat() not in snapshots]
+        )
+        missing = [day for day in dates if day < today and day.isoformat() not in snapshots]
+        snapshots |= await self._fetch_gaps(missing)
+        return {
+            date_: snapshot
+            for date_, snapshot in snapshots.items()
+            if start_date <= date_ <= end_date
+        }
+
+    async def get_period_matrix(self, start_date: str, end_date: str) -> RateMatrix:
+        return RateMatrix.from_snapshots(await self.get_period_snapshots(start_date, end_date))
+
+    @staticmethod
+    def cross_rate(snapshot: dict[str, float], from_: str, to_: str) -> float:
+        try:
+            return round(snapshot[to_] / snapshot[from_], 6)
+        except (KeyError, ZeroDivisionError):
+            raise CurrencyConversionException
+
+    async def get_rate(self, from_: str, to_: str, date_: str) -> float:
+        if date_ == date.today().isoformat():
+            return self.cross_rate(await self._get_live_rates(), from_, to_)
+        rates = await self.currency_cache.get_rates(self.base_source, date_, [from_, to_])
+        rates[self.base_source] = 1.0
+        if not {from_, to_}.issubset(rates):
+            rates = await self.get_snapshot(date_)
+        return self.cross_rate(rates, from_, to_)
@@ -0,0 +1,69 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from currency_app.core.config import settings
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.scheduler.scheduler import Scheduler
+from currency_app.utils.unitofwork import UserUnitOfWork
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPartitions:
+
+    startup_lock_ttl = 60
+
+    def __init__(self, uow: UserUnitOfWork):
+        self.uow = uow
+        self.settings = settings.JWT
+
+    @property
+    def retention(self) -> timedelta:
+        return timedelta(seconds=max(self.settings.ACCESS_TOKEN_EXPIRES, self.settings.REFRESH_TOKEN_EXPIRES))
+
+    def register(self, scheduler: Scheduler):
+        scheduler.add_job(
+            'token_partitions',
+            self.maintain,
+            interval=self.settings.PARTITION_MAINTENANCE_INTERVAL
+        )
+
+    async def ensure(self, currency_cache: CurrencyCache):
+        # after a downtime longer than the premade days logins would fail until the first scheduled run
+        if not await currency_cache.acquire_lock('token_partitions:startup', self.startup_lock_ttl):
+            return
+        try:
+            await self.maintain()
+        except Exception:
+            logger.exception('Token partition maintenance at startup failed')
+
+    async def maintain(self):
+        report = await self.run()
+        logger.info('Token partitions maintained: %s', report)
+
+    async def run(self, dry_run: bool = False) -> dict:
+        now = datetime.now(timezone.utc)
+        upcoming = [now.date() + timedelta(days=offset) for offset in range(self.settings.PARTITION_PREMAKE_DAYS + 1)]
+        async with self.uow:
+            partitions = await self.uow.jwt_repo.get_partitions()
+            missing = [day for day in upcoming if day not in partitions.values()]
+            # a day goes only after the longest lived token issued at its end has expired
+            expired = sorted(name for name, day in partitions.items() if self._end(day) + self.retention <= now)
+            rows = await self.uow.jwt_repo.count_partition_rows(expired)
+            if not dry_run:
+                for day in missing:
+                    await self.uow.jwt_repo.create_partition(day)
+                for name in expired:
+                    await self.uow.jwt_repo.drop_partition(name)
+                await self.uow.commit()
+        return {
+            'partitions_created': [day.isoformat() for day in missing],
+            'partitions_dropped': expired,
+            'rows_reclaimed': rows,
+            'dry_run': dry_run
+        }
+
+    @staticmethod
+    def _end(day: date) -> datetime:
+        return datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
@@ -1,21 +1,21 @@
-from passlib.context import CryptContext
 from typing import Any
 
 from currency_app.api.schemas.user import BasicUserCreate, NewUserProfile, UserCreatedResponse
 from currency_app.api.schemas.user import UserInfo
 from currency_app.exceptions.exceptions import UserAlreadyExistsException
+from currency_app.utils.password_hasher import PasswordHasher
 from currency_app.utils.unitofwork import UserUnitOfWork
 
 
 class UserService:
 
-    def __init__(self, uow: UserUnitOfWork):
+    def __init__(self, uow: UserUnitOfWork, password_hasher: PasswordHasher):
         self.uow = uow
-        self._bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+        self.password_hasher = password_hasher
 
     async def create_user(self, user: BasicUserCreate) -> UserCreatedResponse:
         async with self.uow:
-            user_data = self._user_data_prep(user)
+            user_data = await self._user_data_prep(user)
             await self._check_user_registration(user_data)
             new_user = await self.uow.user_repo.create_user(user_data)
             await self.uow.commit()
@@ -26,14 +26,14 @@ class UserService:
         )
         return UserCreatedResponse(user=new_user_profile)
 
-    def _user_data_prep(self, user_data: BasicUserCreate) -> dict[str, Any]:
+    async def _user_data_prep(self, user_data: BasicUserCreate) -> dict[str, Any]:
         user_data = user_data.model_dump()
-        user_data['hashed_password'] = self._create_password_hash(user_data.pop('password'))
+        user_data['hashed_password'] = await self._create_password_hash(user_data.pop('password'))
         user_data['email'] = user_data['email'].lower()
         return user_data
 
-    def _create_password_hash(self, password: str) -> str:
-        return self._bcrypt_context.hash(password)
+    async def _create_password_hash(self, password: str) -> str:
+        return await self.password_hasher.hash(password)
 
     async def _check_user_registration(self, user: dict[str, Any]):
         username_count, email_count = await self.uow.user_repo.get_user_count(user['username'], user['email'])
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+
+from currency_app.cache.archive import RateArchive
+from currency_app.cache.registry import CurrencyRegistry
+from currency_app.client.currency import CurrencyClient
+from currency_app.core.config import settings
+from currency_app.exceptions.exceptions import CurrencyException
+from currency_app.repositories.currency_cache import CurrencyCache
+from currency_app.services.rates import RateEngine
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmup:
+
+    def __init__(
+            self,
+            currency_client: CurrencyClient,
+            currency_cache: CurrencyCache,
+            currency_registry: CurrencyRegistry,
+            rate_archive: RateArchive | None = None
+    ):
+        self.currency_client = currency_client
+        self.currency_cache = currency_cache
+        self.currency_registry = currency_registry
+        self.rate_engine = RateEngine(currency_client, currency_cache, rate_archive)
+        self.settings = settings.WARMUP
+        self.ready = not self.settings.ENABLED
+        self.report: dict = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self.settings.ENABLED:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run(self) -> dict:
+        self.report = {
+            'currencies': 0,
+            'snapshots_cached': 0,
+            'snapshots_archived': 0,
+            'snapshots_fetched': 0,
+            'snapshots_failed': 0,
+            'live_snapshot': False,
+            'timed_out': False
+        }
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._warm(), self.settings.TIMEOUT)
+        except TimeoutError:
+            self.report['timed_out'] = True
+            logger.warning('Cache warm-up timed out after %s s', self.settings.TIMEOUT)
+        except Exception:
+            logger.exception('Cache warm-up failed')
+        finally:
+            self.report['duration'] = round(time.perf_counter() - started, 3)
+            self.ready = True
+        logger.info('Cache warm-up finished: %s', self.report)
+        return self.report
+
+    async def _warm(self):
+        await self.currency_registry.ensure(self._load_available_currencies)
+        self.report['currencies'] = len(self.currency_registry.codes)
+        today = date.today()
+        dates = [(today - timedelta(days=offset)).isoformat() for offset in range(1, self.settings.DAYS + 1)]
+        cached = await self.currency_cache.get_rate_snapshots(self.rate_engine.base_source, dates)
+        self.report['snapshots_cached'] = len(cached)
+        archived = self.rate_engine.get_archived_snapshots([date_ for date_ in dates if date_ not in cached])
+        self.report['snapshots_archived'] = len(archived)
+        missing = [date_ for date_ in dates if date_ not in cached and date_ not in archived]
+        # only one worker goes upstream for the gaps, the others keep what is already in Redis
+        if missing and await self.currency_cache.acquire_lock('warmup', self.settings.TIMEOUT):
+            semaphore = asyncio.Semaphore(self.settings.CONCURRENCY)
+            results = await asyncio.gather(
+                *(self._fetch_snapshot(semaphore, date_) for date_ in missing),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(result, CurrencyException):
+                    raise result
+            self.report['snapshots_failed'] = sum(isinstance(result, Exception) for result in results)
+            self.report['snapshots_fetched'] = len(results) - self.report['snapshots_failed']
+        if settings.CACHE.LIVE_FRESH_TTL:
+            await self.rate_engine.get_live_snapshot()
+            self.report['live_snapshot'] = True
+
+    async def _fetch_snapshot(self, semaphore: asyncio.Semaphore, date_: str):
+        async with semaphore:
+            await self.rate_engine.seal_snapshot(date_)
+
+    async def _load_available_currencies(self) -> dict[str, str]:
+        if currencies := await self.currency_cache.get_available_currencies():
+            return currencies
+        currencies = await self.currency_client.get_currency_list()
+        await self.currency_cache.set_available_currencies(currencies)
+        return currencies
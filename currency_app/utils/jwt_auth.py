@@ -1,17 +1,20 @@
 import jwt
+import time
 from datetime import datetime, timedelta, timezone
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from typing import Any, Literal
 from uuid import uuid4
 
+from currency_app.cache.tokens import TokenCache
 from currency_app.core.config import settings
 from currency_app.exceptions.exceptions import AccessTokenExpiredException, InvalidTokenException
 
 
 class JWTAuth:
 
-    def __init__(self):
+    def __init__(self, token_cache: TokenCache | None = None):
         self.settings = settings.JWT
+        self.token_cache = token_cache
 
     def create_jwt_token(self, email: str, token_type: Literal['access', 'refresh'], data=None) -> str:
         current_time = datetime.now(tz=timezone.utc)
@@ -45,6 +48,9 @@ class JWTAuth:
         return jwt.decode(token, options={'verify_signature': False})
 
     def decode_jwt_token(self, token, verify_exp: bool = True):
+        # only tokens that are still valid get cached, so a hit is good for either verify_exp
+        if self.token_cache is not None and (decoded_token := self.token_cache.get(token)) is not None:
+            return decoded_token
         try:
             decoded_token = jwt.decode(
                 token,
@@ -58,4 +64,6 @@ class JWTAuth:
         except InvalidTokenError:
             raise InvalidTokenException(message='Error raised while decoding token. Please login again')
         else:
+            if self.token_cache is not None and decoded_token['exp'] > time.time():
+                self.token_cache.set(token, decoded_token)
             return decoded_token
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from redis.asyncio import Redis
+
+
+logger = logging.getLogger(__name__)
+
+
+class Metric(ABC):
+
+    type_: str
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self.flushed: dict[tuple, float] = {}
+
+    @property
+    def key(self) -> str:
+        return f'metrics:{self.name}'
+
+    def _series(self, suffix: str, labelvalues: tuple, **extra) -> str:
+        labels = ','.join(
+            f'{name}="{value}"'
+            for name, value in (*zip(self.labelnames, labelvalues), *extra.items())
+        )
+        return f'{self.name}{suffix}{{{labels}}}' if labels else f'{self.name}{suffix}'
+
+    def samples(self) -> dict[tuple, float]:
+        return dict(self._values)
+
+    @abstractmethod
+    def series(self, sample: tuple) -> str:
+        pass
+
+    def deltas(self, samples: dict[tuple, float]) -> dict[str, float]:
+        return {
+            self.series(sample): value - self.flushed.get(sample, 0)
+            for sample, value in samples.items()
+            if value != self.flushed.get(sample, 0)
+        }
+
+    def sort_key(self, series: str) -> tuple:
+        return (series,)
+
+
+class Counter(Metric):
+
+    type_ = 'counter'
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def series(self, sample: tuple) -> str:
+        return self._series('', sample)
+
+
+class Histogram(Metric):
+
+    type_ = 'histogram'
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    suffixes = ('_bucket', '_sum', '_count')
+    bound_label = re.compile(r',?le="([^"]+)"')
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = default_buckets
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[tuple, list[int]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        if (counts := self._counts.get(labelvalues)) is None:
+            counts = self._counts[labelvalues] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def samples(self) -> dict[tuple, float]:
+        # buckets are kept per interval on the hot path and made cumulative only here
+        samples = {}
+        for labelvalues, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                samples[('bucket', labelvalues, bound)] = cumulative
+            samples[('count', labelvalues)] = cumulative
+            samples[('sum', labelvalues)] = self._values[labelvalues]
+        return samples
+
+    def series(self, sample: tuple) -> str:
+        match sample:
+            case ('bucket', labelvalues, bound):
+                return self._series('_bucket', labelvalues, le=bound)
+            case (suffix, labelvalues):
+                return self._series(f'_{suffix}', labelvalues)
+
+    def deltas(self, samples: dict[tuple, float]) -> dict[str, float]:
+        # every bucket of a changed label set is written, empty ones included, so a scrape never misses one
+        changed = {sample[1] for sample, value in samples.items() if value != self.flushed.get(sample, 0)}
+        return {
+            self.series(sample): value - self.flushed.get(sample, 0)
+            for sample, value in samples.items()
+            if sample[1] in changed
+        }
+
+    def sort_key(self, series: str) -> tuple:
+        # the text format wants buckets of a label set in increasing le order, followed by its sum and count
+        name, _, labels = series.partition('{')
+        bound = self.bound_label.search(labels)
+        return (
+            self.bound_label.sub('', labels).rstrip('}'),
+            self.suffixes.index(name.removeprefix(self.name)),
+            float(bound.group(1)) if bound else 0.0
+        )
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    def counter(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            description: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = Histogram.default_buckets
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def _register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    async def flush(self, redis_conn: Redis):
+        async with self._flush_lock:
+            samples = {metric: metric.samples() for metric in self.metrics.values()}
+            pipe = redis_conn.pipeline(transaction=False)
+            for metric, metric_samples in samples.items():
+                for series, delta in metric.deltas(metric_samples).items():
+                    pipe.hincrbyfloat(metric.key, series, delta)
+            await pipe.execute()
+            # a failed flush leaves flushed values untouched, so its deltas are retried next time
+            for metric, metric_samples in samples.items():
+                metric.flushed = metric_samples
+
+    def start(self, redis_conn: Redis, interval: float):
+        self._task = asyncio.create_task(self._flush_periodically(redis_conn, interval))
+
+    async def stop(self, redis_conn: Redis):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush(redis_conn)
+
+    async def _flush_periodically(self, redis_conn: Redis, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(redis_conn)
+            except Exception:
+                logger.warning('Metrics flush failed, keeping deltas for the next one')
+
+    async def render(self, redis_conn: Redis) -> str:
+        pipe = redis_conn.pipeline(transaction=False)
+        for metric in self.metrics.values():
+            pipe.hgetall(metric.key)
+        lines = []
+        for metric, series in zip(self.metrics.values(), await pipe.execute()):
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.type_}')
+            lines.extend(
+                f'{name} {series[name]}'
+                for name in sorted(series, key=metric.sort_key)
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+cache_requests = registry.counter(
+    'currency_cache_requests_total',
+    'Cache lookups by tier and result',
+    ('tier', 'result')
+)
+upstream_requests = registry.counter(
+    'currency_upstream_requests_total',
+    'Requests sent to the currency API by endpoint and outcome',
+    ('endpoint', 'outcome')
+)
+upstream_latency = registry.histogram(
+    'currency_upstream_request_duration_seconds',
+    'Currency API request latency',
+    ('endpoint',)
+)
+broker_publishes = registry.counter(
+    'currency_broker_publishes_total',
+    'Kafka publishes by topic and outcome',
+    ('topic', 'outcome')
+)
+broker_publish_latency = registry.histogram(
+    'currency_broker_publish_duration_seconds',
+    'Kafka publish latency',
+    ('topic',)
+)
+batch_size = registry.histogram(
+    'currency_batch_size',
+    'Number of requests served by one micro-batch',
+    ('batcher',),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+batch_wait = registry.histogram(
+    'currency_batch_wait_seconds',
+    'Time a micro-batch stays open before it is flushed',
+    ('batcher',),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+revocation_checks = registry.counter(
+    'currency_token_revocation_checks_total',
+    'Token revocation checks by the tier that answered them',
+    ('tier',)
+)
+password_hashes = registry.counter(
+    'currency_password_hash_total',
+    'Password hash and verify operations by outcome',
+    ('operation', 'outcome')
+)
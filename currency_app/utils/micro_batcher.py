@@ -0,0 +1,66 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+from currency_app.utils import metrics
+
+
+@dataclass
+class Batch:
+
+    key: Hashable
+    opened_at: float
+    items: list[tuple[Any, asyncio.Future]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher:
+
+    def __init__(
+            self,
+            name: str,
+            func: Callable[[Hashable, list[Any]], Awaitable[list[Any]]],
+            window: float,
+            max_size: int
+    ):
+        self.name = name
+        self.func = func
+        self.window = window
+        self.max_size = max_size
+        self._batches: dict[Hashable, Batch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if (batch := self._batches.get(key)) is None:
+            batch = self._batches[key] = Batch(key=key, opened_at=time.perf_counter())
+            batch.timer = loop.call_later(self.window, self._flush, batch)
+        future = loop.create_future()
+        batch.items.append((item, future))
+        if len(batch.items) >= self.max_size:
+            self._flush(batch)
+        return await future
+
+    def _flush(self, batch: Batch):
+        if self._batches.get(batch.key) is not batch:
+            return
+        del self._batches[batch.key]
+        batch.timer.cancel()
+        metrics.batch_size.observe(len(batch.items), self.name)
+        metrics.batch_wait.observe(time.perf_counter() - batch.opened_at, self.name)
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Batch):
+        try:
+            results = await self.func(batch.key, [item for item, _ in batch.items])
+        except Exception as exc:
+            for _, future in batch.items:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch.items, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,44 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from typing import Any, Callable
+
+from currency_app.exceptions.exceptions import PasswordHasherBusyException
+from currency_app.utils import metrics
+
+
+class PasswordHasher:
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+        self.pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    def start(self):
+        # bcrypt releases the GIL while hashing, so threads run it in parallel with the event loop
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hasher')
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run('hash', self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run('verify', self.context.verify, password, hashed_password)
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args) -> Any:
+        if self.pending >= self.max_pending:
+            metrics.password_hashes.inc(operation, 'rejected')
+            raise PasswordHasherBusyException(message='Please try again in a second')
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+        metrics.password_hashes.inc(operation, 'ok')
+        return result
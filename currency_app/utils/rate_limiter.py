@@ -0,0 +1,17 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60 / requests_per_minute
+        self._next_at = 0.0
+
+    async def acquire(self):
+        # every caller books the next free slot, so requests are spaced evenly and never exceed the budget
+        now = time.monotonic()
+        slot = max(now, self._next_at)
+        self._next_at = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,195 @@
+import math
+import numpy as np
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+from currency_app.api.schemas.currency import (
+    ExchangeRatePeriodAlterResponse,
+    ExchangeRatePeriodDailyResponse,
+    ExchangeRateResponse
+)
+
+
+class CurrencyIndex:
+
+    def __init__(self, codes: Iterable[str]):
+        self.codes = tuple(sorted(set(codes)))
+        self.positions = {code: position for position, code in enumerate(self.codes)}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.positions
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CurrencyIndex) and self.codes == other.codes
+
+    def locate(self, codes: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.positions[code] for code in codes), dtype=np.intp)
+
+
+class PackedSnapshot(Mapping):
+
+    def __init__(self, index: CurrencyIndex, values: np.ndarray):
+        self.index = index
+        self.values = values
+
+    def __getitem__(self, code: str) -> float:
+        rate = self.values[self.index.positions[code]]
+        if math.isnan(rate):
+            raise KeyError(code)
+        return float(rate)
+
+    def __iter__(self) -> Iterator[str]:
+        return (code for code, rate in zip(self.index.codes, self.values.tolist()) if not math.isnan(rate))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.values)))
+
+
+class RateMatrix:
+
+    def __init__(self, index: CurrencyIndex, dates: np.ndarray, values: np.ndarray):
+        self.index = index
+        self.dates = dates
+        self.values = values
+
+    @classmethod
+    def from_snapshots(
+            cls,
+            snapshots: dict[str, Mapping[str, float]],
+            index: CurrencyIndex | None = None
+    ) -> 'RateMatrix':
+        if index is None:
+            index = CurrencyIndex(code for snapshot in snapshots.values() for code in cls._codes(snapshot))
+        dates = sorted(snapshots)
+        values = np.full((len(dates), len(index)), np.nan, dtype=np.float64)
+        for row, date_ in enumerate(dates):
+            snapshot = snapshots[date_]
+            if isinstance(snapshot, PackedSnapshot):
+                # packed snapshots are copied column-wise without touching single rates
+                if snapshot.index == index:
+                    values[row] = snapshot.values
+                    continue
+                known = np.fromiter((code in index for code in snapshot.index.codes), dtype=bool)
+                codes = [code for code in snapshot.index.codes if code in index]
+                values[row, index.locate(codes)] = snapshot.values[known]
+                continue
+            codes = [code for code in snapshot if code in index]
+            values[row, index.locate(codes)] = [snapshot[code] for code in codes]
+        return cls(index, np.array(dates, dtype='datetime64[D]'), values)
+
+    @classmethod
+    def from_quotes(
+            cls,
+            source: str,
+            quotes: dict[str, dict[str, float]],
+            index: CurrencyIndex | None = None
+    ) -> 'RateMatrix':
+        snapshots = {
+            date_: {key[len(source):]: rate for key, rate in date_quotes.items()} | {source: 1.0}
+            for date_, date_quotes in quotes.items()
+        }
+        return cls.from_snapshots(snapshots, index)
+
+    @staticmethod
+    def _codes(snapshot: Mapping[str, float]) -> Iterable[str]:
+        return snapshot.index.codes if isinstance(snapshot, PackedSnapshot) else snapshot
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.dates.nbytes
+
+    @property
+    def date_labels(self) -> list[str]:
+        return np.datetime_as_string(self.dates, unit='D').tolist()
+
+    def slice(self, start_date: str, end_date: str) -> 'RateMatrix':
+        start = np.searchsorted(self.dates, np.datetime64(start_date, 'D'), side='left')
+        end = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right')
+        return RateMatrix(self.index, self.dates[start:end], self.values[start:end])
+
+    def cross_rates(self, source: str, targets: Iterable[str]) -> np.ndarray:
+        source_column = self.values[:, self.index.positions[source], np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.values[:, self.index.locate(targets)] / source_column
+
+    def pair_rates(self, rows: np.ndarray, sources: Iterable[str], targets: Iterable[str]) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.values[rows, self.index.locate(targets)] / self.values[rows, self.index.locate(sources)]
+
+    def known_targets(self, targets: Iterable[str]) -> list[str]:
+        return [target for target in targets if target in self.index]
+
+    def to_exchange_rate_response(
+            self,
+            source: str,
+            targets: Iterable[str],
+            date_: str,
+            row: int = 0
+    ) -> ExchangeRateResponse:
+        targets = self.known_targets(targets)
+        rates = self.cross_rates(source, targets)[row].round(6).tolist()
+        return ExchangeRateResponse(
+            date=date_,
+            source=source,
+            exchange_rate=self._to_mapping(targets, rates)
+        )
+
+    def to_daily_response(
+            self,
+            source: str,
+            targets: Iterable[str],
+            start_date: str,
+            end_date: str
+    ) -> ExchangeRatePeriodDailyResponse:
+        period = self.slice(start_date, end_date)
+        targets = period.known_targets(targets)
+        rates = period.cross_rates(source, targets).round(6).tolist()
+        return ExchangeRatePeriodDailyResponse(
+            start_date=start_date,
+            end_date=end_date,
+            source=source,
+            data={
+                date_: self._to_mapping(targets, day_rates)
+                for date_, day_rates in zip(period.date_labels, rates)
+            }
+        )
+
+    def to_dynamics_response(
+            self,
+            source: str,
+            targets: Iterable[str],
+            start_date: str,
+            end_date: str
+    ) -> ExchangeRatePeriodAlterResponse:
+        targets = self.known_targets(targets)
+        rates = self.slice(start_date, end_date).cross_rates(source, targets)
+        start_rates, end_rates = rates[0], rates[-1]
+        change = end_rates - start_rates
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = change / start_rates * 100
+        columns = zip(
+            start_rates.round(6).tolist(),
+            end_rates.round(6).tolist(),
+            change.round(4).tolist(),
+            change_pct.round(4).tolist()
+        )
+        return ExchangeRatePeriodAlterResponse(
+            start_date=start_date,
+            end_date=end_date,
+            source=source,
+            dynamics={
+                target: dict(zip(('start_rate', 'end_rate', 'change', 'change_pct'), values))
+                for target, values in zip(targets, columns)
+                if not any(map(math.isnan, values))
+            }
+        )
+
+    @staticmethod
+    def _to_mapping(targets: list[str], rates: list[float]) -> dict[str, float]:
+        return {target: rate for target, rate in zip(targets, rates) if not math.isnan(rate)}
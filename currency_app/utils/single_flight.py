@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Flight:
+
+    key: Hashable
+    task: asyncio.Task
+    waiters: int = field(default=1)
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._flights: dict[Hashable, Flight] = {}
+        self.flights_total = 0
+        self.waiters_total = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        if (flight := self._flights.get(key)) is not None:
+            flight.waiters += 1
+        else:
+            flight = Flight(key=key, task=asyncio.ensure_future(func()))
+            flight.task.add_done_callback(lambda _: self._finish(flight))
+            self._flights[key] = flight
+        # shield keeps the shared call alive if one of the waiters is cancelled
+        return await asyncio.shield(flight.task)
+
+    def _finish(self, flight: Flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        self.flights_total += 1
+        self.waiters_total += flight.waiters
+        if not flight.task.cancelled():
+            flight.task.exception()
+        logger.debug('Flight %s served %d waiter(s)', flight.key, flight.waiters)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
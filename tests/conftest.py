@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from datetime import date, timedelta
+
+from currency_app.services.rates import RateEngine
+
+
+class FakeCache:
+
+    def __init__(self):
+        self.cached: dict[str, dict[str, float]] = {}
+        self.stored: dict[str, dict[str, float]] = {}
+
+    async def get_rate_snapshots(self, source, dates):
+        return {date_: self.cached[date_] for date_ in dates if date_ in self.cached}
+
+    async def set_rate_snapshots(self, source, snapshots):
+        self.stored |= snapshots
+
+
+class FakeClient:
+
+    def __init__(self):
+        # start date of a requested span -> exception raised for it
+        self.failures: dict[str, Exception] = {}
+        self.requests: list[tuple[str, str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_timeframe_rate_snapshots(self, start_date, end_date, source):
+        self.requests.append((start_date, end_date, source))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if start_date in self.failures:
+            raise self.failures[start_date]
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        return {
+            (start + timedelta(days=offset)).isoformat(): {source: 1.0, 'EUR': 0.9}
+            for offset in range((end - start).days + 1)
+        }
+
+
+@pytest.fixture
+def fake_cache() -> FakeCache:
+    return FakeCache()
+
+
+@pytest.fixture
+def fake_client() -> FakeClient:
+    return FakeClient()
+
+
+@pytest.fixture
+def rate_engine(fake_client, fake_cache) -> RateEngine:
+    return RateEngine(fake_client, fake_cache)
@@ -0,0 +1,30 @@
+import asyncio
+
+from currency_app.cache.archive import RateArchive
+
+
+def test_stored_days_are_read_back(tmp_path):
+    archive = RateArchive(tmp_path)
+    asyncio.run(archive.store('USD', {
+        '2024-01-02': {'USD': 1.0, 'EUR': 0.9},
+        '2024-12-31': {'USD': 1.0, 'EUR': 0.95, 'GBP': 0.8},
+        '2023-06-01': {'USD': 1.0, 'JPY': 140.0},
+    }))
+
+    snapshots = archive.get_snapshots('USD', ['2024-01-02', '2024-12-31', '2023-06-01', '2024-01-03', '2022-01-01'])
+
+    assert set(snapshots) == {'2024-01-02', '2024-12-31', '2023-06-01'}
+    assert dict(snapshots['2024-12-31']) == {'EUR': 0.95, 'GBP': 0.8, 'USD': 1.0}
+    assert dict(snapshots['2024-01-02']) == {'EUR': 0.9, 'USD': 1.0}
+    assert sorted(path.name for path in (tmp_path / 'USD').glob('*.npy')) == ['2023.npy', '2024.npy']
+
+
+def test_partial_restore_keeps_archived_values(tmp_path):
+    archive = RateArchive(tmp_path)
+    asyncio.run(archive.store('USD', {'2024-01-02': {'USD': 1.0, 'EUR': 0.9, 'GBP': 0.8}}))
+    asyncio.run(archive.store('USD', {'2024-01-02': {'USD': 1.0, 'CHF': 0.85}, '2024-01-03': {'USD': 1.0, 'EUR': 0.91}}))
+
+    snapshots = RateArchive(tmp_path).get_snapshots('USD', ['2024-01-02', '2024-01-03'])
+
+    assert dict(snapshots['2024-01-02']) == {'CHF': 0.85, 'EUR': 0.9, 'GBP': 0.8, 'USD': 1.0}
+    assert snapshots['2024-01-03']['EUR'] == 0.91
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import pytest
+from datetime import date
+
+from currency_app.exceptions.exceptions import CurrencyApiUnavailableException
+from currency_app.services.backfill import HistoryBackfill
+from currency_app.services.rates import RateEngine
+
+
+@pytest.fixture
+def make_backfill(fake_client, tmp_path):
+    # every instance starts from the checkpoint on disk, like a new run of the command
+    def make() -> HistoryBackfill:
+        return HistoryBackfill(
+            fake_client,
+            None,
+            None,
+            checkpoint_path=tmp_path / 'checkpoint.json',
+            concurrency=2,
+            requests_per_minute=60000
+        )
+
+    return make
+
+
+def test_plan_spans_fit_timeframe_limit(make_backfill):
+    plan = make_backfill().plan(
+        ['USD'],
+        date(2020, 1, 1),
+        date(2021, 12, 31)
+    )
+    assert plan['USD'] == [
+        (date(2020, 1, 1), date(2020, 12, 30)),
+        (date(2020, 12, 31), date(2021, 12, 30)),
+        (date(2021, 12, 31), date(2021, 12, 31)),
+    ]
+    assert all((end - start).days < RateEngine.timeframe_limit for start, end in plan['USD'])
+
+
+def test_dry_run_sends_nothing(make_backfill, fake_client, tmp_path):
+    report = asyncio.run(make_backfill().run(['USD', 'EUR'], date(2020, 1, 1), date(2020, 12, 31), dry_run=True))
+    assert report['requests'] == 4 and report['days_pending'] == 732
+    assert fake_client.requests == []
+    assert not (tmp_path / 'checkpoint.json').exists()
+
+
+def test_resume_fetches_only_failed_chunks(make_backfill, fake_client, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    fake_client.failures['2020-12-31'] = CurrencyApiUnavailableException()
+    report = asyncio.run(make_backfill().run(['USD'], date(2020, 1, 1), date(2021, 6, 30)))
+
+    assert report['requests'] == 2 and report['chunks_failed'] == 1 and report['days_fetched'] == 365
+    assert json.loads(checkpoint_path.read_text()) == {'USD': [['2020-01-01', '2020-12-30']]}
+
+    fake_client.failures.clear()
+    fake_client.requests.clear()
+    report = asyncio.run(make_backfill().run(['USD'], date(2020, 1, 1), date(2021, 6, 30)))
+
+    assert fake_client.requests == [('2020-12-31', '2021-06-30', 'USD')]
+    assert report['chunks_failed'] == 0 and report['days_fetched'] == 182
+    assert json.loads(checkpoint_path.read_text()) == {
+        'USD': [['2020-01-01', '2020-12-30'], ['2020-12-31', '2021-06-30']]
+    }
+    assert make_backfill().plan(['USD'], date(2020, 1, 1), date(2021, 6, 30)) == {'USD': []}
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+
+from currency_app.api.schemas.currency import CurrencyConvertBatchRequest, CurrencyConvertRequest
+from currency_app.cache.registry import CurrencyRegistry
+from currency_app.core.config import settings
+from currency_app.exceptions.exceptions import ExchangeRateInfoException, WrongCurrencyCodeException
+from currency_app.services.currency import CurrencyService
+from currency_app.utils.rate_matrix import RateMatrix
+
+
+SNAPSHOTS = {
+    '2024-01-02': {'USD': 1.0, 'EUR': 0.9, 'GBP': 0.8},
+    # GBP is absent on this day, so its matrix cell is NaN
+    '2024-01-03': {'USD': 1.0, 'EUR': 0.92},
+}
+
+
+@pytest.fixture
+def currency_service(fake_client, fake_cache) -> CurrencyService:
+    registry = CurrencyRegistry(ttl=3600)
+    registry.load({'USD': 'Dollar', 'EUR': 'Euro', 'GBP': 'Pound', 'JPY': 'Yen'})
+    service = CurrencyService(fake_client, fake_cache, registry, currency_publisher=None)
+
+    async def get_matrix(dates):
+        return RateMatrix.from_snapshots({date_: SNAPSHOTS[date_] for date_ in dates if date_ in SNAPSHOTS})
+
+    service.rate_engine.get_matrix = get_matrix
+    return service
+
+
+def item(from_: str, to_: str, date_: str, amount: str = '10') -> CurrencyConvertRequest:
+    return CurrencyConvertRequest(exchange_from=from_, exchange_to=to_, date=date_, amount=amount)
+
+
+def test_batch_maps_errors_per_position_and_keeps_order(currency_service):
+    batch = CurrencyConvertBatchRequest(items=[
+        item('EUR', 'GBP', '2024-01-02'),
+        item('EUR', 'XXX', '2024-01-02'),
+        item('EUR', 'GBP', '2024-01-03'),
+        item('USD', 'EUR', '2024-01-05'),
+        item('JPY', 'EUR', '2024-01-02'),
+        item('USD', 'EUR', '2024-01-03', amount='2.5'),
+    ])
+    results = asyncio.run(currency_service.exchange_currency_batch(batch)).results
+
+    assert [result.exchange_to for result in results] == ['GBP', 'XXX', 'GBP', 'EUR', 'EUR', 'EUR']
+    assert results[0].error is None
+    assert results[0].exchange_rate == round(0.8 / 0.9, 6)
+    assert results[0].result == round(10 * round(0.8 / 0.9, 6), 4)
+    assert results[1].error == WrongCurrencyCodeException.detail
+    # NaN cell of a known currency on a known day
+    assert results[2].error == ExchangeRateInfoException.detail
+    assert results[2].exchange_rate is None and results[2].result is None
+    # date without any snapshot
+    assert results[3].error == ExchangeRateInfoException.detail
+    # currency known to the registry but never quoted
+    assert results[4].error == ExchangeRateInfoException.detail
+    assert results[5].error is None and results[5].exchange_rate == 0.92 and results[5].result == 2.3
+
+
+def test_missing_dates_are_coalesced_into_timeframe_requests(rate_engine, fake_client):
+    dates = [f'2023-{month:02d}-{day:02d}' for month in range(1, 13) for day in range(1, 29, 3)]
+    snapshots = asyncio.run(rate_engine.get_snapshots(dates))
+
+    assert list(snapshots) == dates
+    assert fake_client.requests == [('2023-01-01', '2023-12-28', 'USD')]
+
+
+def test_missing_spans_are_fetched_with_bounded_concurrency(rate_engine, fake_client):
+    dates = [f'{year}-03-01' for year in range(2000, 2020)]
+    snapshots = asyncio.run(rate_engine.get_snapshots(dates))
+
+    assert set(snapshots) == set(dates)
+    assert len(fake_client.requests) == len(dates)
+    assert fake_client.max_in_flight == settings.CURRENCY.MAX_PARALLEL_FETCHES
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from aiohttp import ClientConnectionError
+
+from currency_app.client.currency import CurrencyClient
+from currency_app.exceptions.exceptions import CurrencyApiUnavailableException, ExchangeRateInfoException
+from currency_app.utils import metrics
+
+
+class FakeResponse:
+
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        if isinstance(self.payload, Exception):
+            raise self.payload
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        payload = self.payloads.pop(0)
+        return payload if isinstance(payload, FakeResponse) else FakeResponse(payload)
+
+
+def make_client(*payloads) -> CurrencyClient:
+    client = CurrencyClient()
+    client.session = FakeSession(*payloads)
+    return client
+
+
+def test_no_data_answer_is_cached_as_negative():
+    client = make_client({'success': False, 'error': {'code': 106, 'info': 'no rates for this date'}})
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(ExchangeRateInfoException):
+                await client.get_hist_rate_snapshot('1990-01-01', 'USD')
+
+    asyncio.run(scenario())
+    assert client.session.calls == 1
+
+
+@pytest.mark.parametrize('payload', [
+    {'success': False, 'error': {'code': 104, 'info': 'usage limit reached'}},
+    ClientConnectionError('connection reset'),
+    FakeResponse({'message': 'API rate limit reached'}, status=429),
+    FakeResponse({'message': 'Invalid authentication credentials'}, status=401),
+    FakeResponse({'message': 'Internal server error'}, status=502),
+    {'message': 'API rate limit reached'},
+])
+def test_outage_fails_fast_and_is_not_cached_as_negative(payload):
+    client = make_client(payload)
+    failed = metrics.upstream_requests.samples().get(('historical', 'failed'), 0)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(CurrencyApiUnavailableException):
+                await client.get_hist_rate_snapshot('2024-01-02', 'USD')
+
+    asyncio.run(scenario())
+    assert client.session.calls == 1
+    assert len(client.negative_cache) == 0
+    assert metrics.upstream_requests.samples()[('historical', 'failed')] == failed + 1
+
+
+def test_unavailable_answer_has_503_status():
+    assert CurrencyApiUnavailableException().status_code == 503
+    assert ExchangeRateInfoException().status_code == 406
+
+
+def test_get_snapshots_drops_missing_data_only(rate_engine, fake_client, fake_cache):
+    fake_client.failures['2024-01-03'] = ExchangeRateInfoException()
+    snapshots = asyncio.run(rate_engine.get_snapshots(['2022-01-02', '2024-01-03']))
+    assert set(snapshots) == {'2022-01-02'}
+    assert set(fake_cache.stored) == {'2022-01-02'}
+
+
+def test_get_snapshots_reraises_outage(rate_engine, fake_client):
+    fake_client.failures['2024-01-03'] = CurrencyApiUnavailableException()
+    with pytest.raises(CurrencyApiUnavailableException):
+        asyncio.run(rate_engine.get_snapshots(['2022-01-02', '2024-01-03']))
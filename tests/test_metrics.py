@@ -0,0 +1,80 @@
+import asyncio
+
+from currency_app.utils.metrics import MetricsRegistry
+
+
+class FakePipeline:
+
+    def __init__(self, hashes: dict[str, dict[str, str]]):
+        self.hashes = hashes
+        self.commands = []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.commands.append(('hincrbyfloat', key, field, amount))
+
+    def hgetall(self, key):
+        self.commands.append(('hgetall', key))
+
+    async def execute(self):
+        results = []
+        for command, key, *args in self.commands:
+            fields = self.hashes.setdefault(key, {})
+            if command == 'hincrbyfloat':
+                field, amount = args
+                fields[field] = str(float(fields.get(field, 0)) + amount)
+            results.append(dict(fields))
+        return results
+
+
+class FakeRedis:
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.hashes)
+
+
+def test_histogram_renders_every_bucket_in_le_order():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('endpoint',), buckets=(0.5, 2.5, 10))
+    latency.observe(1, 'live')
+    latency.observe(20, 'live')
+    latency.observe(0.1, 'hist')
+    redis_conn = FakeRedis()
+
+    asyncio.run(registry.flush(redis_conn))
+    lines = asyncio.run(registry.render(redis_conn)).splitlines()
+
+    assert lines == [
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{endpoint="hist",le="0.5"} 1.0',
+        'latency_seconds_bucket{endpoint="hist",le="2.5"} 1.0',
+        'latency_seconds_bucket{endpoint="hist",le="10"} 1.0',
+        'latency_seconds_bucket{endpoint="hist",le="+Inf"} 1.0',
+        'latency_seconds_sum{endpoint="hist"} 0.1',
+        'latency_seconds_count{endpoint="hist"} 1.0',
+        'latency_seconds_bucket{endpoint="live",le="0.5"} 0.0',
+        'latency_seconds_bucket{endpoint="live",le="2.5"} 1.0',
+        'latency_seconds_bucket{endpoint="live",le="10"} 1.0',
+        'latency_seconds_bucket{endpoint="live",le="+Inf"} 2.0',
+        'latency_seconds_sum{endpoint="live"} 21.0',
+        'latency_seconds_count{endpoint="live"} 2.0',
+    ]
+
+
+def test_unlabelled_histogram_and_counter_render():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests', ('outcome',))
+    size = registry.histogram('size', 'Size', buckets=(1, 2))
+    requests.inc('success')
+    requests.inc('error')
+    size.observe(2)
+    redis_conn = FakeRedis()
+
+    asyncio.run(registry.flush(redis_conn))
+    lines = asyncio.run(registry.render(redis_conn)).splitlines()
+
+    assert lines[2:4] == ['requests_total{outcome="error"} 1.0', 'requests_total{outcome="success"} 1.0']
+    assert lines[6:] == ['size_bucket{le="1"} 0.0', 'size_bucket{le="2"} 1.0', 'size_bucket{le="+Inf"} 1.0', 'size_sum 2.0', 'size_count 1.0']
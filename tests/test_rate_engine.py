@@ -0,0 +1,52 @@
+import asyncio
+from datetime import date, timedelta
+
+from currency_app.services.rates import RateEngine
+
+
+def days(start: date, count: int) -> list[date]:
+    return [start + timedelta(days=offset) for offset in range(count)]
+
+
+def test_coalesce_gaps_keeps_full_year_in_one_span():
+    spans = RateEngine.coalesce_gaps(days(date(2021, 1, 1), 365))
+    assert spans == [(date(2021, 1, 1), date(2021, 12, 31))]
+
+
+def test_coalesce_gaps_splits_leap_year():
+    spans = RateEngine.coalesce_gaps(days(date(2020, 1, 1), 366))
+    assert spans == [(date(2020, 1, 1), date(2020, 12, 30)), (date(2020, 12, 31), date(2020, 12, 31))]
+
+
+def test_coalesce_gaps_spans_never_exceed_limit():
+    missing = days(date(2019, 6, 1), 1500)[::3] + [date(2024, 1, 1)]
+    spans = RateEngine.coalesce_gaps(list(reversed(missing)))
+    assert all((end - start).days < RateEngine.timeframe_limit for start, end in spans)
+    assert spans[0][0] == min(missing) and spans[-1][1] == max(missing)
+    covered = {day for start, end in spans for day in missing if start <= day <= end}
+    assert covered == set(missing)
+
+
+def test_coalesce_gaps_empty():
+    assert RateEngine.coalesce_gaps([]) == []
+
+
+def test_period_through_today_uses_live_rates_and_fetches_only_past_gaps(rate_engine, fake_client, fake_cache):
+    today = date.today()
+    period = days(today - timedelta(days=6), 7)
+    fake_cache.cached = {day.isoformat(): {'USD': 1.0, 'EUR': 0.8} for day in period[:-1]}
+
+    async def get_live_rates():
+        return {'USD': 1.0, 'EUR': 0.85}
+
+    rate_engine._get_live_rates = get_live_rates
+    snapshots = asyncio.run(rate_engine.get_period_snapshots(period[0].isoformat(), today.isoformat()))
+
+    assert fake_client.requests == []
+    assert snapshots[today.isoformat()] == {'USD': 1.0, 'EUR': 0.85}
+    assert set(snapshots) == {day.isoformat() for day in period}
+
+    del fake_cache.cached[period[2].isoformat()]
+    asyncio.run(rate_engine.get_period_snapshots(period[0].isoformat(), today.isoformat()))
+    assert fake_client.requests == [(period[2].isoformat(), period[2].isoformat(), 'USD')]
+    assert set(fake_cache.stored) == {period[2].isoformat()}
@@ -0,0 +1,43 @@
+import time
+
+from currency_app.cache.revocation import RevocationStore
+
+
+def make_store() -> RevocationStore:
+    return RevocationStore(None, None, None)
+
+
+def test_revoked_tokens_are_added_and_announced():
+    store = make_store()
+    announced = []
+    store.subscribe(announced.append)
+    expires_at = time.time() + 60
+
+    store.evict({'kind': 'revoked', 'tokens': {'a': expires_at, 'b': expires_at}})
+
+    assert store.contains('a') and store.contains('b') and len(store) == 2
+    assert announced == [{'a': expires_at, 'b': expires_at}]
+
+
+def test_expired_tokens_are_pruned_on_later_revocations():
+    store = make_store()
+    now = time.time()
+    store.evict({'kind': 'revoked', 'tokens': {'old': now + 0.01, 'kept': now + 60}})
+    time.sleep(0.02)
+
+    store.evict({'kind': 'revoked', 'tokens': {'new': now + 60}})
+
+    assert not store.contains('old')
+    assert store.contains('kept') and store.contains('new') and len(store) == 2
+
+
+def test_later_expiry_of_a_revoked_token_is_kept():
+    store = make_store()
+    now = time.time()
+    store.evict({'kind': 'revoked', 'tokens': {'a': now + 0.01}})
+    store.evict({'kind': 'revoked', 'tokens': {'a': now + 60}})
+    time.sleep(0.02)
+
+    store.evict({'kind': 'revoked', 'tokens': {'b': now + 60}})
+
+    assert store.contains('a') and len(store) == 2
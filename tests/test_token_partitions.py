@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from currency_app.repositories.jwt import JWTRepository
+from currency_app.services.token_partitions import TokenPartitions
+
+
+class FakeScalars:
+
+    def __init__(self, values):
+        self.values = values
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def all(self):
+        return list(self.values)
+
+
+class FakeSession:
+
+    def __init__(self, partitions: dict[str, int]):
+        # partition name -> number of rows in it
+        self.partitions = partitions
+        self.statements: list[str] = []
+
+    async def scalars(self, stmt, params=None):
+        if 'pg_inherits' in stmt.text:
+            return FakeScalars(list(self.partitions) + ['jwt_tokens_legacy'])
+        return FakeScalars([rows for name, rows in self.partitions.items() if f'.{name}' in stmt.text])
+
+    async def execute(self, stmt, params=None):
+        self.statements.append(stmt.text)
+
+
+class FakeUOW:
+
+    def __init__(self, session: FakeSession):
+        self.jwt_repo = JWTRepository(session)
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+
+def make_partitions(session: FakeSession) -> tuple[TokenPartitions, FakeUOW]:
+    uow = FakeUOW(session)
+    return TokenPartitions(uow), uow
+
+
+def test_creates_upcoming_and_drops_expired_partitions():
+    today = datetime.now(timezone.utc).date()
+    service, _ = make_partitions(FakeSession({}))
+    expired_day = today - timedelta(days=service.retention.days + 2)
+    kept_day = today - timedelta(days=1)
+    session = FakeSession({
+        JWTRepository.partition_name(expired_day): 40,
+        JWTRepository.partition_name(expired_day - timedelta(days=1)): 2,
+        JWTRepository.partition_name(kept_day): 7,
+        JWTRepository.partition_name(today): 1,
+    })
+    service, uow = make_partitions(session)
+
+    report = asyncio.run(service.run())
+
+    upcoming = [today + timedelta(days=offset) for offset in range(1, service.settings.PARTITION_PREMAKE_DAYS + 1)]
+    dropped = sorted([
+        JWTRepository.partition_name(expired_day),
+        JWTRepository.partition_name(expired_day - timedelta(days=1)),
+    ])
+    assert report == {
+        'partitions_created': [day.isoformat() for day in upcoming],
+        'partitions_dropped': dropped,
+        'rows_reclaimed': 42,
+        'dry_run': False
+    }
+    assert session.statements == [
+        'CREATE TABLE IF NOT EXISTS currency_converter.jwt_tokens_p'
+        f'{day:%Y%m%d} PARTITION OF currency_converter.jwt_tokens '
+        f"FOR VALUES FROM ('{day} 00:00:00+00') TO ('{day + timedelta(days=1)} 00:00:00+00')"
+        for day in upcoming
+    ] + [f'DROP TABLE currency_converter.{name}' for name in dropped]
+    assert uow.commits == 1
+
+
+def test_dry_run_issues_no_ddl():
+    today = datetime.now(timezone.utc).date()
+    session = FakeSession({JWTRepository.partition_name(today - timedelta(days=400)): 5})
+    service, uow = make_partitions(session)
+
+    report = asyncio.run(service.run(dry_run=True))
+
+    assert report['dry_run'] is True
+    assert report['rows_reclaimed'] == 5
+    assert len(report['partitions_created']) == service.settings.PARTITION_PREMAKE_DAYS + 1
+    assert session.statements == []
+    assert uow.commits == 0